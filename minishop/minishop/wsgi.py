@@ -15,4 +15,10 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'minishop.settings')
 
 application = get_wsgi_application()
 
+from django.conf import settings  # noqa: E402
+
+if settings.WARMUP_ON_STARTUP:
+    from store.warmup import warm_up  # noqa: E402
+    warm_up()
+
 app = application
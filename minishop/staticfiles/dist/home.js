@@ -0,0 +1,172 @@
+document.addEventListener('DOMContentLoaded', function() {
+function getCookie(name) {
+let cookieValue = null;
+if (document.cookie && document.cookie !== '') {
+const cookies = document.cookie.split(';');
+for (let i = 0; i < cookies.length; i++) {
+const cookie = cookies[i].trim();
+if (cookie.substring(0, name.length + 1) === (name + '=')) {
+cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+break;
+}
+}
+}
+return cookieValue;
+}
+const csrftoken = getCookie('csrftoken');
+document.querySelectorAll('.wishlist-btn').forEach(btn => {
+btn.addEventListener('click', function() {
+const url = this.dataset.url;
+const icon = this.querySelector('i');
+const self = this;
+if (!url) return;
+self.classList.add('loading');
+self.disabled = true;
+fetch(url, {
+method: 'POST',
+headers: {
+'X-Requested-With': 'XMLHttpRequest',
+'X-CSRFToken': csrftoken,
+'Accept': 'application/json',
+},
+credentials: 'same-origin'
+}).then(async response => {
+self.classList.remove('loading');
+self.disabled = false;
+let data = {};
+try {
+data = await response.json();
+} catch (e) {
+console.error('Failed to parse response:', e);
+}
+if (response.status === 401 || data.login_required) {
+const loginUrl = (data && data.login_url) ? data.login_url : '/accounts/login/';
+window.location.href = loginUrl + '?next=' + encodeURIComponent(window.location.pathname + window.location.search);
+return;
+}
+if (response.ok && data.success) {
+if (data.created) {
+self.classList.add('active');
+icon.classList.remove('bi-heart');
+icon.classList.add('bi-heart-fill');
+showToast('Added to Wishlist','Product saved to your wishlist','success');
+}
+updateWishlistCount(data.wishlist_count);
+} else {
+showToast('Wishlist Error',data.error || 'Could not update wishlist', 'danger');
+}
+}).catch(err => {
+self.classList.remove('loading');
+self.disabled = false;
+showToast('Network Error','Unable to reach server. Please check your connection.', 'danger');
+console.error('Wishlist error:', err);
+});
+});
+});
+function updateWishlistCount(count) {
+const badge = document.querySelector('.badge-count.wishlist-count');
+if (typeof count !== 'undefined') {
+const wishlistCount = parseInt(count) || 0;
+if (wishlistCount > 0) {
+if (badge) {
+badge.textContent = wishlistCount;
+} else {
+const wishlistLink = document.querySelector('a[href*="wishlist"]');
+if (wishlistLink) {
+const newBadge = document.createElement('span');
+newBadge.className = 'badge-count wishlist-count';
+newBadge.textContent = wishlistCount;
+wishlistLink.appendChild(newBadge);
+}
+}
+} else {
+if (badge) {
+badge.remove();
+}
+}
+}
+}
+document.querySelectorAll('.quickview-btn').forEach(btn => {
+btn.addEventListener('click', function () {
+window.location.href = this.dataset.url;
+});
+});
+document.querySelectorAll('.qty-btn').forEach(btn => {
+btn.addEventListener('click', function() {
+const productId = this.dataset.id;
+const input = document.getElementById(`qty-${productId}`);
+const max = parseInt(input.max);
+const min = parseInt(input.min);
+let value = parseInt(input.value) || min;
+if (this.classList.contains('plus') && value < max) {
+input.value = value + 1;
+} else if (this.classList.contains('minus') && value > min) {
+input.value = value - 1;
+}
+});
+});
+document.querySelectorAll('.qty-input').forEach(input => {
+input.addEventListener('change', function() {
+const max = parseInt(this.max);
+const min = parseInt(this.min);
+let value = parseInt(this.value) || min;
+if (value < min) {
+this.value = min;
+} else if (value > max) {
+this.value = max;
+showToast('Maximum Reached', `Only ${max} items available in stock`,'warning');
+}
+});
+});
+document.querySelectorAll('.add-to-cart-form').forEach(form => {
+form.addEventListener('submit', function(e) {
+e.preventDefault();
+const submitBtn = this.querySelector('.add-to-cart-btn');
+if (submitBtn) {
+submitBtn.classList.add('adding');
+}
+const url = this.action;
+const formData = new FormData(this);
+fetch(url, {
+method: 'POST',
+headers: {
+'X-Requested-With': 'XMLHttpRequest',
+'X-CSRFToken': csrftoken,
+'Accept': 'application/json'
+},
+body: formData,
+credentials: 'same-origin'
+}).then(async response => {
+let data = {};
+try { data = await response.json(); } catch (e) {}
+clearIdempotencyKey(form);
+if (submitBtn) submitBtn.classList.remove('adding');
+if (response.status === 401 || data.login_required) {
+const loginUrl = (data && data.login_url) ? data.login_url : '/accounts/login/';
+window.location.href = loginUrl + '?next=' + encodeURIComponent(window.location.pathname + window.location.search);
+return;
+}
+if (response.ok && data.success) {
+const badge = document.querySelector('.badge-count.cart-count');
+if (badge) {
+badge.textContent = data.cart_count;
+} else if (data.cart_count && data.cart_count > 0) {
+const cartIcon = document.querySelector('a[href*="cart"]');
+if (cartIcon) {
+const span = document.createElement('span');
+span.className = 'badge-count cart-count';
+span.textContent = data.cart_count;
+cartIcon.appendChild(span);
+}
+}
+showToast('Added to Cart',`${formData.get('quantity') || 1} item(s) added to your cart`,'success');
+} else {
+showToast('Add to Cart Failed',data.error || 'Could not add item to cart','danger');
+}
+}).catch(err => {
+if (submitBtn) submitBtn.classList.remove('adding');
+showToast('Network Error','Unable to reach server. Please check your connection.','danger');
+});
+});
+});
+});
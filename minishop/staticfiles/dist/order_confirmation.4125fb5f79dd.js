@@ -0,0 +1,16 @@
+document.addEventListener('DOMContentLoaded', function() {
+const timelineSteps = document.querySelectorAll('.timeline-step');
+timelineSteps.forEach((step, index) => {
+setTimeout(() => {
+step.style.opacity = '1';
+step.style.transform = 'translateY(0)';
+}, index * 300);
+});
+const printBtn = document.querySelector('button[onclick*="print"]');
+if (printBtn) {
+printBtn.addEventListener('click', function() {
+const toast = new bootstrap.Toast(document.getElementById('toast') ||
+document.createElement('div'));
+});
+}
+});
@@ -0,0 +1,53 @@
+function idempotencyKey(form) {
+let field = form.querySelector('input[name="idempotency_key"]');
+if (!field) {
+field = document.createElement('input');
+field.type = 'hidden';
+field.name = 'idempotency_key';
+form.appendChild(field);
+}
+if (!field.value) {
+field.value = (window.crypto && crypto.randomUUID)
+? crypto.randomUUID().replace(/-/g, '')
+: Date.now().toString(36) + Math.random().toString(36).slice(2);
+}
+return field.value;
+}
+function clearIdempotencyKey(form) {
+const field = form.querySelector('input[name="idempotency_key"]');
+if (field) field.value = '';
+}
+document.addEventListener('submit', function(e) {
+if (e.target.matches('form[data-idempotent]')) idempotencyKey(e.target);
+}, true);
+window.addEventListener('pageshow', function(e) {
+if (e.persisted) document.querySelectorAll('form[data-idempotent]').forEach(clearIdempotencyKey);
+});
+document.addEventListener('DOMContentLoaded', function() {
+const cartForms = Array.from(document.querySelectorAll('form[action*="add_to_cart"]'));
+cartForms.forEach(form => {
+form.addEventListener('submit', function(e) {
+e.preventDefault();
+const submitBtn = form.querySelector('button[type="submit"]');
+if (submitBtn) {
+submitBtn.classList.add('btn-adding');
+}
+const cartIcon = document.querySelector('.bi-cart3') || document.querySelector('.bi-cart');
+if (cartIcon) {
+cartIcon.classList.add('cart-bump');
+setTimeout(() => cartIcon.classList.remove('cart-bump'), 700);
+}
+setTimeout(() => form.submit(), 300);
+});
+});
+document.querySelectorAll('input[type="number"][name="quantity"]').forEach(input => {
+input.addEventListener('change', function() {
+const min = parseInt(this.getAttribute('min') || 1, 10);
+const max = parseInt(this.getAttribute('max') || 9999, 10);
+let v = parseInt(this.value || min, 10);
+if (isNaN(v) || v < min) v = min;
+if (v > max) v = max;
+this.value = v;
+});
+});
+});
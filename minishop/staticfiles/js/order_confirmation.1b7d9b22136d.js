@@ -0,0 +1,23 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Add some interactive animations
+    const timelineSteps = document.querySelectorAll('.timeline-step');
+
+    timelineSteps.forEach((step, index) => {
+        // Add staggered animation
+        setTimeout(() => {
+            step.style.opacity = '1';
+            step.style.transform = 'translateY(0)';
+        }, index * 300);
+    });
+
+    // Print button functionality
+    const printBtn = document.querySelector('button[onclick*="print"]');
+    if (printBtn) {
+        printBtn.addEventListener('click', function() {
+            // Show print success message
+            const toast = new bootstrap.Toast(document.getElementById('toast') || 
+                document.createElement('div'));
+            // You could add a toast message here
+        });
+    }
+});
@@ -1,3 +1,40 @@
+// Idempotency keys are created in the browser when a form is sent, never
+// rendered by the server: catalogue pages are revalidated with 304s and would
+// hand back a key that was already used. A retry after a network error reuses
+// the key, so the server answers it from the stored response; once the server
+// has answered, clearIdempotencyKey() makes the next submit a new request.
+function idempotencyKey(form) {
+  let field = form.querySelector('input[name="idempotency_key"]');
+  if (!field) {
+    field = document.createElement('input');
+    field.type = 'hidden';
+    field.name = 'idempotency_key';
+    form.appendChild(field);
+  }
+  if (!field.value) {
+    field.value = (window.crypto && crypto.randomUUID)
+      ? crypto.randomUUID().replace(/-/g, '')
+      : Date.now().toString(36) + Math.random().toString(36).slice(2);
+  }
+  return field.value;
+}
+
+function clearIdempotencyKey(form) {
+  const field = form.querySelector('input[name="idempotency_key"]');
+  if (field) field.value = '';
+}
+
+// Plain (non-AJAX) forms: a double click submits twice with the same key.
+// Capture phase, so the key is in place before any AJAX submit handler reads the form.
+document.addEventListener('submit', function(e) {
+  if (e.target.matches('form[data-idempotent]')) idempotencyKey(e.target);
+}, true);
+
+// A page restored from the back/forward cache must not resend an answered key.
+window.addEventListener('pageshow', function(e) {
+  if (e.persisted) document.querySelectorAll('form[data-idempotent]').forEach(clearIdempotencyKey);
+});
+
 document.addEventListener('DOMContentLoaded', function() {
   const cartForms = Array.from(document.querySelectorAll('form[action*="add_to_cart"]'));
   cartForms.forEach(form => {
@@ -1,8 +1,39 @@
 from django.contrib import admin
 from django import forms
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 
+from .catalogue import bump_catalogue_version
 from .models import Product
+from .thumbnails import thumbnail_url
+
+
+class EstimatedCountPaginator(Paginator):
+    """Use Postgres' planner estimate instead of COUNT(*) for unfiltered, large tables.
+
+    Filtered or searched changelists still get an exact count, which the
+    indexes keep bounded; small tables and other databases always do.
+    """
+    estimate_threshold = 100000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.estimate_threshold:
+                return row[0]
+        return super().count
 
 class ProductAdminForm(forms.ModelForm):
     class Meta:
@@ -24,12 +55,17 @@ class ProductAdminForm(forms.ModelForm):
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
     form = ProductAdminForm
-    list_display = ('id', 'name', 'price', 'stock', 'status', 'is_available', 'created_at', 'image_preview')
+    list_display = ('id', 'name', 'price', 'stock', 'status', 'is_available', 'created_at', 'thumbnail')
     list_filter = ('status', 'created_at')
+    # Served by the trigram indexes from migration 0008 on Postgres.
     search_fields = ('name', 'description')
     list_editable = ('price', 'stock', 'status')
-    readonly_fields = ('created_at', 'image_preview')
-    fields = ('name', 'description', 'price', 'stock', 'status', 'image', 'image_url', 'image_preview', 'created_at')
+    # Big-catalogue mode: no second COUNT(*) for "x of y", estimated page counts
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    readonly_fields = ('created_at', 'image_preview', 'units_sold', 'wishlist_count')
+    fields = ('name', 'description', 'price', 'stock', 'status', 'image', 'image_url', 'image_preview',
+              'units_sold', 'wishlist_count', 'created_at')
     ordering = ('-created_at',)
     actions = ['mark_active', 'mark_inactive']
 
@@ -47,12 +83,45 @@ class ProductAdmin(admin.ModelAdmin):
         return 'No image'
     image_preview.short_description = 'Preview'
 
+    def thumbnail(self, obj):
+        url = thumbnail_url(obj)
+        if url:
+            return format_html('<img src="{}" loading="lazy" width="48" height="48" style="object-fit:cover;" />', url)
+        return '-'
+    thumbnail.short_description = 'Image'
+
+    def changelist_view(self, request, extra_context=None):
+        # list_editable saves: collect the edited rows in save_model() and write
+        # them with one bulk_update instead of an UPDATE per row.
+        if request.method == 'POST' and '_save' in request.POST:
+            request._bulk_edited = []
+            with transaction.atomic():
+                response = super().changelist_view(request, extra_context)
+                edited = request._bulk_edited
+                if edited:
+                    now = timezone.now()
+                    for obj in edited:
+                        obj.updated_at = now
+                    Product.objects.bulk_update(edited, [*self.list_editable, 'updated_at'], batch_size=500)
+                    bump_catalogue_version(search='status' in self.list_editable)
+            return response
+        return super().changelist_view(request, extra_context)
+
+    def save_model(self, request, obj, form, change):
+        edited = getattr(request, '_bulk_edited', None)
+        if edited is not None and change:
+            edited.append(obj)
+        else:
+            super().save_model(request, obj, form, change)
+
     def mark_active(self, request, queryset):
-        updated = queryset.update(status='ACTIVE')
+        updated = queryset.update(status='ACTIVE', updated_at=timezone.now())
+        bump_catalogue_version(search=True)
         self.message_user(request, f"Marked {updated} product(s) as active")
     mark_active.short_description = 'Mark selected products as Active'
 
     def mark_inactive(self, request, queryset):
-        updated = queryset.update(status='INACTIVE')
+        updated = queryset.update(status='INACTIVE', updated_at=timezone.now())
+        bump_catalogue_version(search=True)
         self.message_user(request, f"Marked {updated} product(s) as inactive")
     mark_inactive.short_description = 'Mark selected products as Inactive'
\ No newline at end of file
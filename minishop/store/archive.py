@@ -0,0 +1,68 @@
+"""Order archival: old orders move from Order/OrderItem to ArchivedOrder/ArchivedOrderItem.
+
+Checkout, the admin and the rollups only touch recent orders, so keeping the
+hot tables small keeps those queries (and their indexes) the same size no
+matter how much history accumulates. Each batch copies and deletes inside one
+transaction, so a run can be interrupted and simply started again. Pages that
+show a single customer's orders read both tables (`find_order`,
+`orders_for_email`).
+"""
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+ARCHIVE_AFTER_DAYS = getattr(settings, 'ORDER_ARCHIVE_AFTER_DAYS', 365)
+
+
+def archive_cutoff(days=ARCHIVE_AFTER_DAYS):
+    return timezone.now() - datetime.timedelta(days=days)
+
+
+def _copy(instance, model):
+    """Unsaved `model` instance with the same column values (the archive tables mirror the hot ones)."""
+    return model(**{field.attname: getattr(instance, field.attname) for field in instance._meta.concrete_fields})
+
+
+def archive_batch(cutoff, batch_size=500, after_id=0):
+    """Move up to `batch_size` orders created before `cutoff` (and with id > after_id).
+
+    Returns the ids moved, in ascending order; an empty list means done.
+    """
+    with transaction.atomic():
+        orders = list(
+            Order.objects.select_for_update()
+            .filter(created_at__lt=cutoff, id__gt=after_id)
+            .order_by('id')[:batch_size]
+        )
+        if not orders:
+            return []
+        ids = [order.id for order in orders]
+        items = OrderItem.objects.filter(order_id__in=ids)
+
+        # ignore_conflicts: rows left by a half-restored archive are not an error.
+        ArchivedOrder.objects.bulk_create([_copy(order, ArchivedOrder) for order in orders], ignore_conflicts=True)
+        ArchivedOrderItem.objects.bulk_create([_copy(item, ArchivedOrderItem) for item in items],
+                                              ignore_conflicts=True)
+        items.delete()
+        Order.objects.filter(id__in=ids).delete()
+    return ids
+
+
+def find_order(order_id):
+    """The order with this id, hot or archived, or None.
+
+    Hot first: that is where nearly all lookups land. An order being archived
+    right now is in one table or the other, never neither.
+    """
+    return Order.objects.filter(id=order_id).first() or ArchivedOrder.objects.filter(id=order_id).first()
+
+
+def orders_for_email(email):
+    """All orders placed with `email`, newest first."""
+    hot = Order.objects.filter(customer_email=email)
+    archived = ArchivedOrder.objects.filter(customer_email=email)
+    return sorted([*hot, *archived], key=lambda order: order.created_at, reverse=True)
@@ -9,6 +9,8 @@ class Cart:
         if not cart:
             cart = self.session[settings.CART_SESSION_ID] = {}
         self.cart = cart
+        self._lines = None
+        self.removed = []
     
     def add(self, product, quantity=1, override_quantity=False):
         product_id = str(product.id)
@@ -26,6 +28,13 @@ class Cart:
         
         self.save()
     
+    def add_many(self, products, quantity=1):
+        """Add `quantity` of each product and mark the session changed once."""
+        for product in products:
+            item = self.cart.setdefault(str(product.id), {'quantity': 0, 'price': str(product.price)})
+            item['quantity'] += quantity
+        self.save()
+    
     def update(self, product_id, quantity):
         product_id = str(product_id)
         if product_id in self.cart:
@@ -38,31 +47,69 @@ class Cart:
             del self.cart[product_id]
             self.save()
     
+    def reconcile(self):
+        """Reprice every line against the catalogue in one query and return the lines.
+
+        The session keeps the price seen when an item was added. Here each
+        line is checked against the product's current price, status and stock,
+        whichever way they changed (product form, admin list_editable bulk
+        edits, actions), and the stored price is corrected. Each line dict has
+        `product`, `quantity`, `price`, `total_price`, plus `price_changed` /
+        `old_price` and `insufficient_stock` / `available` for the templates.
+        Products that are gone or inactive are dropped; their names end up in
+        `self.removed`. The result is kept until the cart is next modified.
+        """
+        if self._lines is not None:
+            return self._lines
+
+        products = {str(product.id): product for product in Product.objects.filter(id__in=list(self.cart))}
+        lines, changed = [], False
+        for product_id, item in list(self.cart.items()):
+            product = products.get(product_id)
+            if product is None or product.status != 'ACTIVE':
+                if product is not None:
+                    self.removed.append(product.name)
+                del self.cart[product_id]
+                changed = True
+                continue
+
+            old_price = Decimal(item['price'])
+            if old_price != product.price:
+                item['price'] = str(product.price)
+                changed = True
+            quantity = item['quantity']
+            lines.append({
+                'product': product,
+                'quantity': quantity,
+                'price': product.price,
+                'total_price': product.price * quantity,
+                'price_changed': old_price != product.price,
+                'old_price': old_price,
+                'insufficient_stock': quantity > product.stock,
+                'available': product.stock,
+            })
+
+        if changed:
+            self.save()
+        self._lines = lines
+        self._total = sum((line['total_price'] for line in lines), Decimal('0'))
+        return lines
+    
     def __iter__(self):
-        product_ids = self.cart.keys()
-        products = Product.objects.filter(id__in=product_ids, status='ACTIVE')
-        
-        # Create a copy of the cart to add product instances
-        cart_copy = self.cart.copy()
-        
-        for product in products:
-            cart_copy[str(product.id)]['product'] = product
-        
-        for item in cart_copy.values():
-            if 'product' in item:
-                item['price'] = Decimal(item['price'])
-                item['total_price'] = item['price'] * item['quantity']
-                yield item
+        return iter(self.reconcile())
     
     def __len__(self):
         return self.cart.values().__len__()
     
     def get_total(self):
-        return sum(Decimal(item['price']) * item['quantity'] for item in self.cart.values())
+        """Total of the reconciled lines (see reconcile)."""
+        self.reconcile()
+        return self._total
     
     def clear(self):
         del self.session[settings.CART_SESSION_ID]
         self.save()
     
     def save(self):
-        self.session.modified = True
\ No newline at end of file
+        self.session.modified = True
+        self._lines = None
\ No newline at end of file
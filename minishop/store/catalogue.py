@@ -0,0 +1,104 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.contrib import messages
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.utils import translation
+
+from .models import CatalogueVersion, Product, Wishlist
+
+
+def get_catalogue_version(field='version'):
+    version = CatalogueVersion.objects.filter(pk=1).values_list(field, flat=True).first()
+    return version or 0
+
+
+def get_search_version():
+    return get_catalogue_version('search_version')
+
+
+def bump_catalogue_version(search=False):
+    """Invalidate listing ETags, and with `search=True` cached search results too.
+
+    Pass `search=True` when a product's name, description or status may have
+    changed; stock and counter updates leave search results alone. Deferred
+    to commit so the hot row is only locked briefly.
+    """
+    fields = ['version', 'search_version'] if search else ['version']
+
+    def _bump():
+        if not CatalogueVersion.objects.filter(pk=1).update(**{field: F(field) + 1 for field in fields}):
+            CatalogueVersion.objects.get_or_create(pk=1, defaults={field: 1 for field in fields})
+    transaction.on_commit(_bump, robust=True)
+
+
+def _viewer_fingerprint(request):
+    """Everything besides the catalogue that changes the rendered page for this visitor.
+
+    Returns None (no validators, always a full response) for staff, whose
+    pages carry live stock statistics, and while flash messages are queued:
+    a 304 would keep them in the session instead of showing them. Computed
+    once per request, since Last-Modified and ETag both ask for it.
+    """
+    if not hasattr(request, '_viewer_fingerprint'):
+        request._viewer_fingerprint = _compute_viewer_fingerprint(request)
+    return request._viewer_fingerprint
+
+
+def _compute_viewer_fingerprint(request):
+    user = request.user
+    if user.is_staff or len(messages.get_messages(request)):
+        return None
+
+    parts = [
+        translation.get_language(),
+        json.dumps(request.session.get(settings.CART_SESSION_ID, {}), sort_keys=True),
+        # Forms on the page embed a token derived from this secret, which
+        # login and logout rotate.
+        request.META.get('CSRF_COOKIE', ''),
+    ]
+    if user.is_authenticated:
+        # Adds always raise the newest added_date, removals always lower the count.
+        wishlist = Wishlist.objects.filter(user=user).aggregate(count=Count('id'), latest=Max('added_date'))
+        parts += [str(user.pk), str(wishlist['count']), str(wishlist['latest'])]
+    return parts
+
+
+def _etag(parts):
+    return hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+
+def listing_etag(request, *args, **kwargs):
+    viewer = _viewer_fingerprint(request)
+    if viewer is None:
+        return None
+    return _etag(['catalogue', str(get_catalogue_version())] + viewer)
+
+
+def _product_updated_at(request, pk):
+    """updated_at of product `pk`, looked up once per request."""
+    if not hasattr(request, '_product_updated_at'):
+        request._product_updated_at = {}
+    if pk not in request._product_updated_at:
+        request._product_updated_at[pk] = Product.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+    return request._product_updated_at[pk]
+
+
+def product_last_modified(request, pk, *args, **kwargs):
+    if _viewer_fingerprint(request) is None:
+        return None
+    return _product_updated_at(request, pk)
+
+
+def product_etag(request, pk, *args, **kwargs):
+    viewer = _viewer_fingerprint(request)
+    if viewer is None:
+        return None
+    updated_at = _product_updated_at(request, pk)
+    if updated_at is None:
+        return None
+    # The catalogue version covers the "frequently bought together" cards,
+    # whose price, stock and ranking change with other products and orders.
+    return _etag(['product', str(pk), updated_at.isoformat(), str(get_catalogue_version())] + viewer)
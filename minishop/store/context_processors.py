@@ -16,6 +16,10 @@ def wishlist_count(request):
     if not request.user.is_authenticated:
         return {'wishlist_count': 0}
 
+    # wishlist_view has already counted the wishlist for its paginator.
+    if hasattr(request, 'wishlist_count'):
+        return {'wishlist_count': request.wishlist_count}
+
     try:
         count = Wishlist.objects.filter(user=request.user).count()
     except (OperationalError, ProgrammingError):
@@ -0,0 +1,159 @@
+"""Idempotency keys for POSTs that must not run twice (checkout, add to cart).
+
+A client sends one key per logical attempt, either in an `Idempotency-Key`
+header or in an `idempotency_key` form field (forms marked `data-idempotent`
+get one from static/js/ui.js when they are submitted). The first request
+with a key claims it by inserting an IdempotencyKey row, runs the view, and
+stores the response on the row.
+Retries with the same key get the stored response back without the view
+running again. A duplicate that arrives while the first is still running
+polls the row until the response is there. Requests without a key behave
+exactly as before.
+"""
+import hashlib
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, transaction
+from django.http import HttpResponse
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+KEY_TTL = getattr(settings, 'IDEMPOTENCY_KEY_TTL', 60 * 60 * 24)
+WAIT_SECONDS = getattr(settings, 'IDEMPOTENCY_WAIT_SECONDS', 10)
+# A key still pending after this long belongs to a request whose worker died.
+PENDING_TIMEOUT = getattr(settings, 'IDEMPOTENCY_PENDING_TIMEOUT', 60)
+POLL_INTERVAL = 0.05
+UNSIGNED_FIELDS = {'csrfmiddlewaretoken', 'idempotency_key'}
+
+
+def request_key(request):
+    key = request.headers.get('Idempotency-Key') or request.POST.get('idempotency_key') or ''
+    return key.strip()[:64]
+
+
+def request_scope(request):
+    """Keys are per user, or per session for anonymous carts."""
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    if request.session.session_key is None:
+        request.session.save()
+    return f'session:{request.session.session_key}'
+
+
+def request_fingerprint(request):
+    """Hash of the path and form fields, so a key can't be reused for a different request."""
+    fields = sorted(
+        (name, value)
+        for name, values in request.POST.lists() if name not in UNSIGNED_FIELDS
+        for value in values
+    )
+    return hashlib.sha256(repr((request.path, fields)).encode()).hexdigest()
+
+
+def _claim(scope, key, fingerprint):
+    """Insert the pending row. Returns (claimed, existing row).
+
+    The row is None both when this request now owns the key and when the
+    owner deleted its row between our insert and our read; only the first
+    has claimed=True.
+    """
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(scope=scope, key=key, fingerprint=fingerprint)
+        return True, None
+    except IntegrityError:
+        return False, IdempotencyKey.objects.filter(scope=scope, key=key).first()
+
+
+def _is_stale(record):
+    age = timezone.now() - record.created_at
+    if record.status_code is None:
+        return age > timedelta(seconds=PENDING_TIMEOUT)
+    return age > timedelta(seconds=KEY_TTL)
+
+
+def _replay(record):
+    response = HttpResponse(bytes(record.body), status=record.status_code, content_type=record.content_type or None)
+    if record.location:
+        response['Location'] = record.location
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _store(scope, key, response):
+    keys = IdempotencyKey.objects.filter(scope=scope, key=key, status_code__isnull=True)
+    if response.streaming or response.status_code >= 500:
+        # Nothing worth replaying; let the client retry for real.
+        keys.delete()
+        return
+    try:
+        with transaction.atomic():
+            keys.update(
+                status_code=response.status_code,
+                content_type=response.get('Content-Type', ''),
+                location=response.get('Location', ''),
+                body=response.content,
+            )
+    except DatabaseError:
+        # The view has run; losing replay for this key beats leaving it
+        # pending, which would answer every retry with 409 until it goes stale.
+        keys.delete()
+
+
+def idempotent(view):
+    """Run `view` at most once per (user or session, Idempotency-Key) for POSTs that carry a key.
+
+    Must not be called inside a transaction: the pending row has to be
+    committed for concurrent duplicates to see it.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request_key(request) if request.method == 'POST' else ''
+        if not key:
+            return view(request, *args, **kwargs)
+
+        scope, fingerprint = request_scope(request), request_fingerprint(request)
+        deadline = time.monotonic() + WAIT_SECONDS
+        while True:
+            claimed, record = _claim(scope, key, fingerprint)
+            if claimed:
+                break
+            if record is None:
+                continue  # gone again (failed or stale); try to claim it ourselves
+            if record.fingerprint != fingerprint:
+                return HttpResponse('Idempotency-Key was already used for a different request.', status=422)
+            if _is_stale(record):
+                IdempotencyKey.objects.filter(pk=record.pk, status_code=record.status_code).delete()
+                continue
+            if record.status_code is not None:
+                return _replay(record)
+            if time.monotonic() >= deadline:
+                response = HttpResponse('A request with this Idempotency-Key is still in progress.', status=409)
+                response['Retry-After'] = '1'
+                return response
+            time.sleep(POLL_INTERVAL)
+
+        try:
+            response = view(request, *args, **kwargs)
+        except BaseException:
+            IdempotencyKey.objects.filter(scope=scope, key=key, status_code__isnull=True).delete()
+            raise
+        _store(scope, key, response)
+        return response
+
+    return wrapper
+
+
+def purge_expired(batch_size=1000):
+    """Delete keys older than KEY_TTL in bounded batches. Returns the number deleted."""
+    cutoff = timezone.now() - timedelta(seconds=KEY_TTL)
+    deleted = 0
+    while True:
+        ids = list(IdempotencyKey.objects.filter(created_at__lt=cutoff).values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(pk__in=ids).delete()[0]
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from store.archive import ARCHIVE_AFTER_DAYS, archive_batch, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = ('Move orders older than ORDER_ARCHIVE_AFTER_DAYS into the archive tables, one batch per '
+            'transaction. Safe to interrupt and re-run.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=ARCHIVE_AFTER_DAYS,
+                            help=f'Archive orders older than this many days (default: {ARCHIVE_AFTER_DAYS})')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of orders moved per transaction (default: 500)')
+        parser.add_argument('--start-id', type=int, default=0,
+                            help='Resume from this order id (exclusive)')
+
+    def handle(self, *args, **options):
+        # Fixed once per run, so a long run doesn't chase orders that age in while it works.
+        cutoff = archive_cutoff(options['days'])
+        batch_size = max(1, options['batch_size'])
+        last_id = options['start_id']
+        moved = 0
+
+        while True:
+            ids = archive_batch(cutoff, batch_size, last_id)
+            if not ids:
+                break
+            moved += len(ids)
+            last_id = ids[-1]
+            self.stdout.write(f'Archived {moved} orders (last id {last_id})')
+
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} orders placed before {cutoff:%Y-%m-%d %H:%M}'))
@@ -0,0 +1,85 @@
+import datetime
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from store.archive import archive_batch, archive_cutoff, find_order, orders_for_email
+from store.models import Order, OrderItem, Product
+
+
+class Command(BaseCommand):
+    help = ('Time hot-table order queries as old orders pile up, first with the old orders still in the '
+            'hot tables and then after archiving them. Runs in a transaction that is rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hot', type=int, default=2000, help='Recent orders kept hot (default: 2000)')
+        parser.add_argument('--steps', type=int, nargs='+', default=[0, 10000, 50000, 100000],
+                            help='Cumulative numbers of old orders to add and archive')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per query, median reported (default: 20)')
+
+    def add_orders(self, count, product, created_at=None):
+        if not count:
+            return
+        first = (Order.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+        orders = Order.objects.bulk_create([
+            Order(customer_name=f'Customer {i % 500}', customer_email=f'customer{i % 500}@example.com',
+                  customer_phone='555-0100', shipping_address='1 Bench Street', total_amount=Decimal('19.99'))
+            for i in range(first, first + count)
+        ], batch_size=2000)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=1, unit_price=Decimal('19.99'), subtotal=Decimal('19.99'))
+            for order in orders
+        ], batch_size=2000)
+        if created_at is not None:
+            # created_at is auto_now_add, so backdate after inserting.
+            Order.objects.filter(id__gte=first).update(created_at=created_at)
+
+    def time(self, query, repeat):
+        runs = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            query()
+            runs.append((time.perf_counter() - started) * 1000)
+        return statistics.median(runs)
+
+    def measure(self, repeat):
+        since = timezone.now() - datetime.timedelta(days=1)
+        latest = Order.objects.order_by('-id').values_list('id', flat=True).first()
+        return [
+            self.time(lambda: list(Order.objects.filter(customer_email='customer7@example.com')), repeat),
+            self.time(lambda: Order.objects.filter(created_at__gte=since).aggregate(Sum('total_amount')), repeat),
+            self.time(lambda: find_order(latest), repeat),
+            self.time(lambda: orders_for_email('customer7@example.com'), repeat),
+        ]
+
+    def handle(self, *args, **options):
+        product = Product.objects.order_by('id').first()
+        if product is None:
+            raise CommandError('Needs at least one product to attach bench order items to.')
+        repeat = max(1, options['repeat'])
+        old = timezone.now() - datetime.timedelta(days=800)
+
+        self.stdout.write('Hot queries: by email | last 24h revenue | by id | my orders (hot + archive), median ms')
+        self.stdout.write(f'{"archived":>9}  {"old orders still hot":<36}  {"after archiving":<36}')
+        with transaction.atomic():
+            self.add_orders(options['hot'], product)
+            added = 0
+            for step in sorted(options['steps']):
+                self.add_orders(step - added, product, created_at=old)
+                added = step
+                before = self.measure(repeat)
+
+                cutoff, last_id = archive_cutoff(), 0
+                while ids := archive_batch(cutoff, 5000, last_id):
+                    last_id = ids[-1]
+                after = self.measure(repeat)
+
+                self.stdout.write(f'{step:>9}  ' + '  '.join(
+                    ' '.join(f'{ms:>8.2f}' for ms in timings) for timings in (before, after)
+                ))
+            transaction.set_rollback(True)
@@ -0,0 +1,55 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from store.search import METRIC_KEYS, normalise_query, result_cache_key, search_product_ids, search_stats
+
+
+class Command(BaseCommand):
+    help = 'Fire a burst of identical concurrent searches and report how many reached the database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('query', nargs='?', default='shirt')
+        parser.add_argument('--requests', type=int, default=200, help='Total searches (default: 200)')
+        parser.add_argument('--threads', type=int, default=20, help='Concurrent workers (default: 20)')
+
+    def handle(self, *args, **options):
+        query = normalise_query(options['query'])
+        total, workers = options['requests'], max(1, options['threads'])
+        # Start cold: no cached result for this query and zeroed counters.
+        cache.delete_many([result_cache_key(query), *METRIC_KEYS.values()])
+
+        start = threading.Barrier(workers)
+        latencies = []
+
+        def worker(count):
+            start.wait()
+            try:
+                for _ in range(count):
+                    began = time.perf_counter()
+                    search_product_ids(query)
+                    latencies.append(time.perf_counter() - began)
+            finally:
+                connection.close()
+
+        per_worker = [total // workers + (1 if i < total % workers else 0) for i in range(workers)]
+        threads = [threading.Thread(target=worker, args=(n,)) for n in per_worker]
+        began = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+
+        stats = search_stats()
+        latencies.sort()
+        self.stdout.write(f'{total} searches for {query!r} on {workers} threads in {elapsed:.3f}s')
+        self.stdout.write(f'  DB search queries: {stats["misses"]} (uncached baseline: {total})')
+        self.stdout.write(f'  cache hits: {stats["hits"]}, coalesced waits: {stats["coalesced"]}, '
+                          f'hit ratio: {stats["hit_ratio"]:.2%}')
+        if latencies:
+            self.stdout.write(f'  p50 {latencies[len(latencies) // 2] * 1000:.2f}ms, '
+                              f'p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f}ms')
@@ -0,0 +1,80 @@
+import datetime
+import random
+import time
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from store.sessions import delete_expired_batch
+
+KEY_PREFIX = 'bench'
+
+
+class Command(BaseCommand):
+    help = ('Fill django_session with expired rows (a third of them holding carts), time session reads, '
+            'run the batched cleanup on those rows and time the reads again. Real sessions are not '
+            'touched; bench rows are removed at the end.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--expired', type=int, default=2_000_000, help='Expired sessions (default: 2,000,000)')
+        parser.add_argument('--live', type=int, default=10_000, help='Live sessions (default: 10,000)')
+        parser.add_argument('--reads', type=int, default=2000, help='Session loads timed per pass (default: 2000)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Cleanup batch size (default: 5000)')
+
+    def fill(self, start, count, expire_date, payloads):
+        for offset in range(0, count, 10_000):
+            Session.objects.bulk_create([
+                Session(session_key=f'{KEY_PREFIX}{i:027d}', session_data=payloads[i % len(payloads)],
+                        expire_date=expire_date)
+                for i in range(start + offset, start + min(offset + 10_000, count))
+            ])
+
+    def time_reads(self, keys, reads):
+        runs = []
+        for key in random.choices(keys, k=reads):
+            started = time.perf_counter()
+            SessionStore(session_key=key).load()
+            runs.append((time.perf_counter() - started) * 1_000_000)
+        runs.sort()
+        return runs[len(runs) // 2], runs[int(len(runs) * 0.99) - 1]
+
+    def handle(self, *args, **options):
+        store = SessionStore()
+        payloads = [
+            store.encode({}),
+            store.encode({'_auth_user_id': '1'}),
+            store.encode({'cart': {'1': {'quantity': 2, 'price': '19.99'}, '7': {'quantity': 1, 'price': '5.00'}}}),
+        ]
+        now = timezone.now()
+        expired, live = options['expired'], options['live']
+        live_keys = [f'{KEY_PREFIX}{i:027d}' for i in range(expired, expired + live)]
+
+        started = time.perf_counter()
+        self.fill(0, expired, now - datetime.timedelta(days=1), payloads)
+        self.fill(expired, live, now + datetime.timedelta(days=14), payloads)
+        self.stdout.write(f'Inserted {expired:,} expired + {live:,} live sessions in {time.perf_counter() - started:.1f}s')
+
+        try:
+            p50, p99 = self.time_reads(live_keys, options['reads'])
+            self.stdout.write(f'Before cleanup: session load p50 {p50:.0f}us, p99 {p99:.0f}us')
+
+            slowest = deleted = 0
+            started = time.perf_counter()
+            while True:
+                batch_started = time.perf_counter()
+                stats = delete_expired_batch(now, options['batch_size'], key_prefix=KEY_PREFIX)
+                if not stats['sessions']:
+                    break
+                slowest = max(slowest, time.perf_counter() - batch_started)
+                deleted += stats['sessions']
+            self.stdout.write(f'Cleanup: {deleted:,} sessions in {time.perf_counter() - started:.1f}s, '
+                              f'longest transaction {slowest * 1000:.0f}ms')
+
+            p50, p99 = self.time_reads(live_keys, options['reads'])
+            self.stdout.write(f'After cleanup:  session load p50 {p50:.0f}us, p99 {p99:.0f}us')
+        finally:
+            while Session.objects.filter(session_key__startswith=KEY_PREFIX).exists():
+                keys = Session.objects.filter(session_key__startswith=KEY_PREFIX).values_list('session_key', flat=True)
+                Session.objects.filter(session_key__in=list(keys[:10_000])).delete()
@@ -0,0 +1,42 @@
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.utils import timezone
+
+from store.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Time home.html rendering for 10, 100 and 1,000 in-memory products (no database reads).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+        parser.add_argument('--repeat', type=int, default=5, help='Renders per size (default: 5)')
+
+    def render(self, products):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+        started = time.perf_counter()
+        render_to_string('home.html', {'products': products, 'user_wishlist_product_ids': set()}, request=request)
+        return (time.perf_counter() - started) * 1000
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"products":>9} {"cold ms":>9} {"warm ms":>9} {"per card":>9}')
+        for size in options['sizes']:
+            # A fresh updated_at means no fragment-cache entries yet, so the
+            # first render is cold; the rest are the repeat visits most pages see.
+            now = timezone.now()
+            products = [
+                Product(id=i, name=f'Product {i}', excerpt='Lorem ipsum ' * 8, price=Decimal('19.99'),
+                        stock=i % 20, status='ACTIVE', image_url=f'https://example.com/{i}.jpg', updated_at=now)
+                for i in range(1, size + 1)
+            ]
+            cold = self.render(products)
+            warm = min(self.render(products) for _ in range(max(1, options['repeat'])))
+            self.stdout.write(f'{size:>9} {cold:>9.1f} {warm:>9.1f} {warm / size:>9.3f}')
@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from store.sessions import delete_expired_batch, empty_stats
+
+
+class Command(BaseCommand):
+    help = ('Delete expired database sessions in small batches (one short transaction each) and report the '
+            'abandoned carts they held. Safe to interrupt and re-run.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Sessions deleted per transaction (default: 5000)')
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help='Seconds to pause between batches to leave room for live traffic')
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE not in ('django.contrib.sessions.backends.db',
+                                           'django.contrib.sessions.backends.cached_db'):
+            raise CommandError(f'Sessions are not stored in the database ({settings.SESSION_ENGINE}).')
+
+        cutoff = timezone.now()
+        batch_size = max(1, options['batch_size'])
+        totals = empty_stats()
+
+        while True:
+            stats = delete_expired_batch(cutoff, batch_size)
+            if not stats['sessions']:
+                break
+            for name, value in stats.items():
+                totals[name] += value
+            self.stdout.write(
+                f'Deleted {totals["sessions"]} sessions; abandoned carts so far: {totals["carts"]} '
+                f'({totals["items"]} items, ${totals["value"]:.2f})'
+            )
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {totals["sessions"]} expired sessions, {totals["carts"]} with abandoned carts '
+            f'holding {totals["items"]} items worth ${totals["value"]:.2f}'
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from store.idempotency import KEY_TTL, purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Delete idempotency keys older than IDEMPOTENCY_KEY_TTL, in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows deleted per statement (default: 1000)')
+
+    def handle(self, *args, **options):
+        deleted = purge_expired(max(1, options['batch_size']))
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} idempotency keys older than {KEY_TTL}s'))
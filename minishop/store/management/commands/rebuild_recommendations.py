@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from store.recommendations import TOP_K, rebuild
+
+
+class Command(BaseCommand):
+    help = ('Rebuild the "frequently bought together" index (top-K partners per product) from all order lines. '
+            'Requires numpy and scipy from requirements-jobs.txt, which the web app itself does not need.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=TOP_K,
+                            help=f'Partners kept per product (default: {TOP_K})')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT (default: 1000)')
+
+    def handle(self, *args, **options):
+        try:
+            written = rebuild(top_k=max(1, options['top_k']), batch_size=options['batch_size'])
+        except ImportError as exc:
+            raise CommandError(f'{exc}. Install requirements-jobs.txt (numpy, scipy) to run the rebuild.')
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} product pairings'))
@@ -0,0 +1,69 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from store.models import ArchivedOrder, Order
+from store.rollups import rebuild_range
+
+
+def _parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'Invalid date {value!r}, expected YYYY-MM-DD')
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the DailySales / DailyProductSales rollups from raw (hot and archived) orders, a few days per transaction.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=_parse_date, help='First day to rebuild (default: first order)')
+        parser.add_argument('--end', type=_parse_date,
+                            help='Last day to rebuild (default: last order, at most yesterday)')
+        parser.add_argument('--batch-days', type=int, default=7,
+                            help='Number of days recomputed per transaction (default: 7)')
+        parser.add_argument('--include-today', action='store_true',
+                            help='Allow rebuilding today. Checkouts during the run can be lost or counted '
+                                 'twice, so only use it while the shop takes no orders.')
+
+    def handle(self, *args, **options):
+        firsts, lasts = [], []
+        for model in (Order, ArchivedOrder):
+            bounds = model.objects.aggregate(first=Min('created_at'), last=Max('created_at'))
+            if bounds['first'] is not None:
+                firsts.append(bounds['first'])
+                lasts.append(bounds['last'])
+        if not firsts and not (options['start'] and options['end']):
+            self.stdout.write('No orders, nothing to rebuild')
+            return
+
+        # Today's rows are still being incremented by checkouts (record_order),
+        # which a concurrent rebuild would race with.
+        today = timezone.localdate()
+        start = options['start'] or timezone.localdate(min(firsts))
+        end = options['end'] or timezone.localdate(max(lasts))
+        if start > end:
+            raise CommandError('--start must not be after --end')
+        if end >= today and not options['include_today']:
+            if options['end'] or options['start'] and options['start'] >= today:
+                raise CommandError('The range covers today, whose rollups checkouts are still updating; '
+                                   'pass --include-today to rebuild it anyway')
+            end = today - datetime.timedelta(days=1)
+            if start > end:
+                self.stdout.write('Only orders from today, nothing to rebuild')
+                return
+        if end >= today:
+            self.stderr.write(self.style.WARNING(
+                'Rebuilding today: orders placed during the run may be missed or counted twice.'))
+        step = datetime.timedelta(days=max(1, options['batch_days']))
+
+        day = start
+        while day <= end:
+            batch_end = min(day + step - datetime.timedelta(days=1), end)
+            rebuild_range(day, batch_end)
+            self.stdout.write(f'Rebuilt {day} .. {batch_end}')
+            day = batch_end + datetime.timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f'Sales rollups rebuilt for {start} .. {end}'))
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from store.models import ArchivedOrderItem, OrderItem, Product, Wishlist
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalised units_sold / wishlist_count counters on Product in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of products recomputed per transaction (default: 1000)')
+        parser.add_argument('--start-id', type=int, default=0,
+                            help='Resume from this product id (exclusive)')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        last_id = options['start_id']
+        checked = changed = 0
+
+        while True:
+            ids = list(
+                Product.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            with transaction.atomic():
+                # Lock the batch first so checkout / wishlist F() updates that
+                # land while we aggregate can't be overwritten by stale totals.
+                products = list(
+                    Product.objects.select_for_update().filter(id__in=ids).only(
+                        'id', 'units_sold', 'wishlist_count'
+                    )
+                )
+                sold = {}
+                for model in (OrderItem, ArchivedOrderItem):
+                    for product_id, total in (
+                        model.objects.filter(product_id__in=ids)
+                        .values('product_id')
+                        .annotate(total=Sum('quantity'))
+                        .values_list('product_id', 'total')
+                    ):
+                        sold[product_id] = sold.get(product_id, 0) + total
+                wished = dict(
+                    Wishlist.objects.filter(product_id__in=ids)
+                    .values('product_id')
+                    .annotate(total=Count('id'))
+                    .values_list('product_id', 'total')
+                )
+
+                stale = []
+                for product in products:
+                    units_sold = sold.get(product.id) or 0
+                    wishlist_count = wished.get(product.id) or 0
+                    if product.units_sold != units_sold or product.wishlist_count != wishlist_count:
+                        product.units_sold = units_sold
+                        product.wishlist_count = wishlist_count
+                        stale.append(product)
+                if stale:
+                    Product.objects.bulk_update(stale, ['units_sold', 'wishlist_count'])
+
+            checked += len(ids)
+            changed += len(stale)
+            last_id = ids[-1]
+            self.stdout.write(f'Checked {checked} products (last id {last_id}), {changed} updated')
+
+        self.stdout.write(self.style.SUCCESS(f'Reconciled {checked} products, {changed} counters corrected'))
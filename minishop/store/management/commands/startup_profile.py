@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter so nothing is already imported.
+CHILD = """
+import os, sys, time
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'minishop.settings')
+started = time.perf_counter()
+import minishop.wsgi
+sys.stderr.write('STARTUP_MS %.1f\\n' % ((time.perf_counter() - started) * 1000))
+"""
+
+
+def measure_startup(warmup=True):
+    """Import minishop.wsgi in a fresh interpreter under -X importtime.
+
+    Returns (startup_ms, modules) with modules as (name, self_us, cumulative_us).
+    """
+    env = dict(os.environ)
+    if not warmup:
+        env['WARMUP_ON_STARTUP'] = 'False'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise CommandError(f'Startup failed:\n{result.stderr[-2000:]}')
+
+    startup_ms = None
+    modules = []
+    for line in result.stderr.splitlines():
+        if line.startswith('STARTUP_MS'):
+            startup_ms = float(line.split()[1])
+        elif line.startswith('import time:') and 'self [us]' not in line:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return startup_ms, modules
+
+
+class Command(BaseCommand):
+    help = 'Measure cold-start time of minishop.wsgi in a fresh interpreter and report per-module import cost.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15, help='Rows per table (default: 15)')
+        parser.add_argument('--budget-ms', type=float,
+                            help='Exit with an error if startup takes longer than this (CI: STARTUP_BUDGET_MS)')
+        parser.add_argument('--no-warmup', action='store_true', help='Measure with WARMUP_ON_STARTUP=False')
+
+    def handle(self, *args, **options):
+        startup_ms, modules = measure_startup(warmup=not options['no_warmup'])
+
+        by_package = defaultdict(int)
+        for name, self_us, _ in modules:
+            by_package[name.split('.')[0]] += self_us
+
+        top = options['top']
+        self.stdout.write(f'Startup (import minishop.wsgi): {startup_ms:.1f}ms, '
+                          f'{len(modules)} modules, {sum(m[1] for m in modules) / 1000:.1f}ms importing')
+        self.stdout.write('\nSelf import time by top-level package:')
+        for package, total in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(f'  {total / 1000:8.1f}ms  {package}')
+        self.stdout.write('\nSlowest modules (cumulative):')
+        for name, _, cumulative in sorted(modules, key=lambda m: -m[2])[:top]:
+            self.stdout.write(f'  {cumulative / 1000:8.1f}ms  {name}')
+
+        budget = options['budget_ms']
+        if budget is not None and startup_ms > budget:
+            raise CommandError(f'Startup took {startup_ms:.1f}ms, over the {budget:.0f}ms budget')
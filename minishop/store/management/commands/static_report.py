@@ -0,0 +1,74 @@
+import re
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+ASSET_RE = re.compile(r'<(?:link[^>]+href|script[^>]+src)="([^"]+)"')
+
+
+def _size(path):
+    return path.stat().st_size if path and path.exists() else None
+
+
+def _source_path(name):
+    found = finders.find(name)
+    return Path(found) if found else None
+
+
+class Command(BaseCommand):
+    help = ('For each page, compare the bytes of local CSS/JS a browser downloads: the raw source files '
+            '(before) against the hashed, minified bundles as served pre-compressed (after). Run after collectstatic.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=['/', '/cart/', '/accounts/login/'])
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            raise CommandError('Run with DEBUG off so pages link the collected bundles.')
+        manifest = {hashed: name for name, hashed in staticfiles_storage.hashed_files.items()}
+        if not manifest:
+            raise CommandError('No staticfiles manifest found; run collectstatic first.')
+
+        root = staticfiles_storage.location
+        prefix = urlsplit(staticfiles_storage.base_url).path
+        client = Client()
+        grand_before = grand_after = 0
+
+        for page in options['paths']:
+            with override_settings(ALLOWED_HOSTS=['*']):
+                response = client.get(page)
+            if response.status_code != 200:
+                self.stderr.write(f'{page}: HTTP {response.status_code}, skipped')
+                continue
+
+            before = after = 0
+            self.stdout.write(f'\n{page}')
+            for url in ASSET_RE.findall(response.content.decode()):
+                path = urlsplit(url).path
+                if not path.startswith(prefix):
+                    continue  # CDN assets are outside this pipeline
+                hashed = path[len(prefix):]
+                name = manifest.get(hashed, hashed)
+                sources = settings.STATIC_BUNDLES.get(name, [name])
+                raw = sum(_size(_source_path(source)) or 0 for source in sources)
+
+                # WhiteNoise sends the smallest variant the browser accepts.
+                served = Path(root) / hashed
+                variants = [_size(served.with_name(served.name + ext)) for ext in ('.br', '.gz', '')]
+                sent = min((size for size in variants if size is not None), default=0)
+                self.stdout.write(f'  {name:<32} {raw:>9,} B -> {sent:>8,} B')
+                before += raw
+                after += sent
+
+            saved = (1 - after / before) * 100 if before else 0
+            self.stdout.write(f'  {"total":<32} {before:>9,} B -> {after:>8,} B  ({saved:.0f}% smaller)')
+            grand_before += before
+            grand_after += after
+
+        self.stdout.write(self.style.SUCCESS(f'\nAll pages: {grand_before:,} B -> {grand_after:,} B'))
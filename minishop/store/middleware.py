@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+
+from .routers import has_written, replica_aliases, reset_pin
+
+PIN_COOKIE = 'primary_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class PrimaryPinMiddleware:
+    """Read-your-writes for replica routing.
+
+    Non-safe requests (cart, checkout, wishlist POSTs) read from the primary
+    throughout. A request that writes catalogue or order data also sets a
+    short-lived cookie, and requests carrying it read from the primary until
+    it expires. This covers, e.g., the order confirmation page right after
+    checkout.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(PIN_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        reset_pin(pinned_until > time.time() or request.method not in SAFE_METHODS)
+
+        try:
+            response = self.get_response(request)
+            wrote = has_written()
+        finally:
+            reset_pin()
+
+        seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+        if wrote and seconds and getattr(settings, 'USE_READ_REPLICAS', True) and replica_aliases():
+            response.set_cookie(PIN_COOKIE, str(time.time() + seconds), max_age=seconds,
+                                httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,50 @@
+# Generated by Django 4.2 on 2026-10-19 11:29
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_counters(apps, schema_editor):
+    Product = apps.get_model('store', 'Product')
+    OrderItem = apps.get_model('store', 'OrderItem')
+    Wishlist = apps.get_model('store', 'Wishlist')
+    last_id = 0
+    while True:
+        products = list(Product.objects.filter(id__gt=last_id).order_by('id').only('id')[:1000])
+        if not products:
+            break
+        ids = [product.id for product in products]
+        sold = dict(
+            OrderItem.objects.filter(product_id__in=ids)
+            .values('product_id').annotate(total=Sum('quantity')).values_list('product_id', 'total')
+        )
+        wished = dict(
+            Wishlist.objects.filter(product_id__in=ids)
+            .values('product_id').annotate(total=Count('id')).values_list('product_id', 'total')
+        )
+        for product in products:
+            product.units_sold = sold.get(product.id) or 0
+            product.wishlist_count = wished.get(product.id) or 0
+        Product.objects.bulk_update(products, ['units_sold', 'wishlist_count'])
+        last_id = ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0003_wishlist'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='units_sold',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='wishlist_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
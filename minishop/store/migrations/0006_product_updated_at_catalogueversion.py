@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-19 11:45
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def create_catalogue_version(apps, schema_editor):
+    CatalogueVersion = apps.get_model('store', 'CatalogueVersion')
+    CatalogueVersion.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0005_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.CreateModel(
+            name='CatalogueVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_catalogue_version, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-19 11:33
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def fill_excerpts(apps, schema_editor):
+    Product = apps.get_model('store', 'Product')
+    batch = []
+    for product in Product.objects.only('id', 'description').iterator(chunk_size=1000):
+        product.excerpt = Truncator(product.description).chars(100)
+        batch.append(product)
+        if len(batch) == 1000:
+            Product.objects.bulk_update(batch, ['excerpt'])
+            batch = []
+    if batch:
+        Product.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0006_product_updated_at_catalogueversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
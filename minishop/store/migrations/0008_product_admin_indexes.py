@@ -0,0 +1,45 @@
+# Generated by Django 4.2 on 2026-10-19 11:40
+
+from django.db import migrations, models
+
+
+# Trigram GIN indexes let Postgres answer the admin's `icontains` search
+# (UPPER(col::text) LIKE UPPER('%term%')) without a sequential scan.
+# Other databases keep the plain LIKE scan.
+TRIGRAM_INDEXES = {
+    'product_name_trgm': 'name',
+    'product_description_trgm': 'description',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON store_product '
+            f'USING gin (UPPER({column}::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0007_product_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-created_at', '-id'], name='product_created_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2 on 2026-10-19 11:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0008_product_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductPairing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pairings', to='store.product')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='store.product')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='productpairing',
+            index=models.Index(fields=['product', '-score'], name='pairing_top_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='productpairing',
+            unique_together={('product', 'related')},
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-19 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0011_order_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='wishlist',
+            index=models.Index(fields=['user', '-added_date', '-id'], name='wishlist_user_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0012_wishlist_user_recent_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='idempotencykey',
+            name='location',
+            field=models.TextField(blank=True),
+        ),
+    ]
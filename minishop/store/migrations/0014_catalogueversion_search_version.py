@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0013_idempotencykey_location_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogueversion',
+            name='search_version',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
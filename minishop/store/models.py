@@ -1,6 +1,7 @@
 from django.db import models
 from django.core.validators import MinValueValidator
 from django.contrib.auth.models import User
+from django.utils.text import Truncator
 import os
 
 # Conditionally import Cloudinary based on environment
@@ -12,6 +13,14 @@ else:
     USE_CLOUDINARY = False
 
 
+class ProductQuerySet(models.QuerySet):
+    # Columns the product card needs; the full description stays on disk.
+    LISTING_FIELDS = ('id', 'name', 'excerpt', 'price', 'stock', 'status', 'image', 'image_url', 'updated_at')
+
+    def for_listing(self):
+        return self.only(*self.LISTING_FIELDS)
+
+
 class Product(models.Model):
     STATUS_CHOICES = [
         ('ACTIVE', 'Active'),
@@ -20,6 +29,8 @@ class Product(models.Model):
     
     name = models.CharField(max_length=100)
     description = models.TextField(max_length=500, blank=True)
+    # Card text, kept equal to `description|truncatechars:100` by save()
+    excerpt = models.CharField(max_length=100, blank=True, editable=False)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.IntegerField(validators=[MinValueValidator(0)])
     
@@ -32,9 +43,31 @@ class Product(models.Model):
     image_url = models.URLField(max_length=255, blank=True)  # legacy/optional
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='ACTIVE')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Denormalised popularity counters, kept in sync with F() updates at
+    # checkout and on wishlist add/remove (see `reconcile_product_counters`).
+    units_sold = models.PositiveIntegerField(default=0, db_index=True, editable=False)
+    wishlist_count = models.PositiveIntegerField(default=0, db_index=True, editable=False)
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Admin changelist / "newest" ordering (ORDER BY created_at DESC, id DESC)
+            models.Index(fields=['-created_at', '-id'], name='product_created_idx'),
+        ]
     
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'description' in update_fields:
+            self.excerpt = Truncator(self.description).chars(100)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
     
     @property
     def is_available(self):
@@ -91,6 +124,34 @@ class OrderItem(models.Model):
         self.subtotal = self.quantity * self.unit_price
         super().save(*args, **kwargs)
 
+class ArchivedOrder(models.Model):
+    """An Order moved out of the hot table by `archive_orders` (see store.archive).
+
+    Keeps the original id, so order URLs keep working.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    customer_name = models.CharField(max_length=100)
+    customer_email = models.EmailField(max_length=100, db_index=True)
+    customer_phone = models.CharField(max_length=20)
+    shipping_address = models.TextField()
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(db_index=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Order #{self.id} - {self.customer_name} (archived)"
+
+class ArchivedOrderItem(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(ArchivedOrder, related_name='items', on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, on_delete=models.PROTECT)
+    quantity = models.IntegerField(validators=[MinValueValidator(1)])
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product.name}"
+
 class Wishlist(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='wishlist')
     product = models.ForeignKey('Product', on_delete=models.CASCADE, related_name='wishlisted_by')
@@ -99,6 +160,94 @@ class Wishlist(models.Model):
     class Meta:
         unique_together = ['user', 'product']
         ordering = ['-added_date']
+        indexes = [
+            # wishlist_view pages through one user's items newest first
+            models.Index(fields=['user', '-added_date', '-id'], name='wishlist_user_recent_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.user.username} - {self.product.name}"
\ No newline at end of file
+        return f"{self.user.username} - {self.product.name}"
+
+class DailySales(models.Model):
+    """Per-day sales rollup maintained by `store.rollups`."""
+    date = models.DateField(unique=True)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    units = models.PositiveIntegerField(default=0)
+    order_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.date} - {self.revenue}"
+
+
+class DailyProductSales(models.Model):
+    """Per-day, per-product sales rollup maintained by `store.rollups`."""
+    date = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='daily_sales')
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    units = models.PositiveIntegerField(default=0)
+    order_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['date', 'product']
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.date} - {self.product_id} x {self.units}"
+
+
+class CatalogueVersion(models.Model):
+    """Single-row counters bumped on Product writes.
+
+    Listing ETags are built from `version`, which every write bumps. Cached
+    search results are keyed on `search_version`, which only changes with
+    what search reads: name, description and status.
+    """
+    version = models.BigIntegerField(default=0)
+    search_version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Catalogue v{self.version}"
+
+
+class ProductPairing(models.Model):
+    """"Frequently bought together" index: orders containing both `product` and `related`.
+
+    Rebuilt to the top-K partners per product by `rebuild_recommendations`
+    and incremented by `store.recommendations.record_order_pairs` in between.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='pairings')
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    score = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['product', 'related']
+        indexes = [
+            models.Index(fields=['product', '-score'], name='pairing_top_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_id} ({self.score})"
+
+
+class IdempotencyKey(models.Model):
+    """A client-supplied key for one POST, with the response it produced (see store.idempotency).
+
+    status_code stays NULL while the first request with the key is running.
+    """
+    scope = models.CharField(max_length=80)
+    key = models.CharField(max_length=64)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    location = models.TextField(blank=True)
+    body = models.BinaryField(default=b'')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ['scope', 'key']
+
+    def __str__(self):
+        return f"{self.scope} {self.key}"
@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .catalogue import bump_catalogue_version
+from .models import ArchivedOrderItem, OrderItem, ProductPairing
+
+TOP_K = getattr(settings, 'RECOMMENDATIONS_TOP_K', 8)
+
+
+def related_products(product, limit=4):
+    """Products most often bought with `product`: a single query on the (product, -score) index."""
+    pairings = (
+        ProductPairing.objects.filter(product=product, related__status='ACTIVE', related__stock__gt=0)
+        .select_related('related')
+        .order_by('-score')[:limit]
+    )
+    return [pairing.related for pairing in pairings]
+
+
+def record_order_pairs(order_id):
+    """Count every pair of distinct products in a committed order (called via on_commit).
+
+    Pairs added here may push a product past TOP_K partners until the next
+    rebuild trims it again; that only costs a few extra rows.
+    """
+    with transaction.atomic():
+        ids = sorted(set(OrderItem.objects.filter(order_id=order_id).values_list('product_id', flat=True)))
+        if len(ids) < 2:
+            return
+        pairs = ProductPairing.objects.filter(product_id__in=ids, related_id__in=ids)
+        existing = set(pairs.values_list('product_id', 'related_id'))
+        pairs.update(score=F('score') + 1)
+        ProductPairing.objects.bulk_create(
+            [
+                ProductPairing(product_id=a, related_id=b, score=1)
+                for a in ids for b in ids
+                if a != b and (a, b) not in existing
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def build_pairings(rows, top_k=TOP_K):
+    """Top-K co-purchase partners per product from (order_id, product_id) rows.
+
+    Vectorised: builds the binary order x product matrix X, takes the
+    product x product co-occurrence matrix C = X^T X with the diagonal
+    removed, and keeps the top_k largest entries of each row.
+    Returns a list of (product_id, related_id, score). Needs numpy and scipy
+    (requirements-jobs.txt).
+    """
+    import numpy as np
+    from scipy import sparse
+
+    rows = np.asarray(rows, dtype=np.int64).reshape(-1, 2)
+    if not len(rows):
+        return []
+    order_ids, order_index = np.unique(rows[:, 0], return_inverse=True)
+    product_ids, product_index = np.unique(rows[:, 1], return_inverse=True)
+
+    purchases = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (order_index, product_index)),
+        shape=(len(order_ids), len(product_ids)),
+    )
+    purchases.data[:] = 1  # several lines of one product in an order count once
+    together = (purchases.T @ purchases).tocsr()
+    together.setdiag(0)
+    together.eliminate_zeros()
+
+    result = []
+    for row in range(together.shape[0]):
+        start, end = together.indptr[row], together.indptr[row + 1]
+        if start == end:
+            continue
+        scores = together.data[start:end]
+        columns = together.indices[start:end]
+        if len(scores) > top_k:
+            keep = np.argpartition(-scores, top_k - 1)[:top_k]
+            scores, columns = scores[keep], columns[keep]
+        product_id = int(product_ids[row])
+        result.extend(
+            (product_id, int(product_ids[column]), int(score))
+            for column, score in zip(columns, scores)
+        )
+    return result
+
+
+def rebuild(top_k=TOP_K, batch_size=1000):
+    """Replace the whole index from all orders, hot and archived. Returns the number of rows written."""
+    rows = [
+        row
+        for model in (OrderItem, ArchivedOrderItem)
+        for row in model.objects.values_list('order_id', 'product_id').iterator(chunk_size=10000)
+    ]
+    pairings = build_pairings(rows, top_k)
+    with transaction.atomic():
+        ProductPairing.objects.all().delete()
+        ProductPairing.objects.bulk_create(
+            [ProductPairing(product_id=a, related_id=b, score=score) for a, b, score in pairings],
+            batch_size=batch_size,
+        )
+        bump_catalogue_version()
+    return len(pairings)
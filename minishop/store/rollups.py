@@ -0,0 +1,105 @@
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ArchivedOrderItem, DailyProductSales, DailySales, Order, OrderItem
+
+
+def _bump(model, lookup, revenue, units, orders):
+    """Add the given amounts to the rollup row matching `lookup`, creating it if needed."""
+    changes = {
+        'revenue': F('revenue') + revenue,
+        'units': F('units') + units,
+        'order_count': F('order_count') + orders,
+    }
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(revenue=revenue, units=units, order_count=orders, **lookup)
+    except IntegrityError:
+        # Another checkout created the row first; fall back to the increment.
+        model.objects.filter(**lookup).update(**changes)
+
+
+def record_order(order_id):
+    """Fold a committed order into the daily rollups.
+
+    Called from `transaction.on_commit` after checkout. Anything missed here
+    (crash between commit and callback, manual edits) is repaired by the
+    `rebuild_sales_rollups` command.
+    """
+    # Everything inside one transaction, so the freshly committed order is read
+    # from the primary rather than a possibly lagging replica.
+    with transaction.atomic():
+        order = Order.objects.filter(id=order_id).only('id', 'created_at').first()
+        if order is None:
+            return
+        day = timezone.localdate(order.created_at)
+
+        per_product = defaultdict(lambda: [Decimal('0'), 0])
+        for product_id, quantity, subtotal in OrderItem.objects.filter(order_id=order_id).values_list(
+            'product_id', 'quantity', 'subtotal'
+        ):
+            per_product[product_id][0] += subtotal
+            per_product[product_id][1] += quantity
+        if not per_product:
+            return
+
+        _bump(
+            DailySales, {'date': day},
+            revenue=sum(revenue for revenue, _ in per_product.values()),
+            units=sum(units for _, units in per_product.values()),
+            orders=1,
+        )
+        # Sorted so concurrent checkouts lock rows in the same order.
+        for product_id in sorted(per_product):
+            revenue, units = per_product[product_id]
+            _bump(DailyProductSales, {'date': day, 'product_id': product_id}, revenue, units, 1)
+
+
+def rebuild_range(start, end):
+    """Recompute both rollup tables for the days in [start, end] from raw orders, hot and archived.
+
+    Not safe for days that still take orders: a checkout's record_order()
+    landing during the rebuild either increments a row about to be replaced
+    or is counted twice. `rebuild_sales_rollups` therefore stops at yesterday
+    unless told otherwise.
+    """
+    start_dt = timezone.make_aware(datetime.datetime.combine(start, datetime.time.min))
+    end_dt = timezone.make_aware(datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min))
+
+    with transaction.atomic():
+        # An order is in exactly one of the two tables, so their totals simply add up.
+        daily = defaultdict(lambda: {'revenue': Decimal('0'), 'units': 0, 'orders': 0})
+        per_product = defaultdict(lambda: {'revenue': Decimal('0'), 'units': 0, 'orders': 0})
+        for model in (OrderItem, ArchivedOrderItem):
+            items = model.objects.filter(order__created_at__gte=start_dt, order__created_at__lt=end_dt).annotate(
+                day=TruncDate('order__created_at')
+            )
+            for keys, totals in (('day',), daily), (('day', 'product_id'), per_product):
+                for row in items.values(*keys).annotate(
+                    revenue=Sum('subtotal'), units=Sum('quantity'), orders=Count('order', distinct=True)
+                ):
+                    total = totals[tuple(row[key] for key in keys)]
+                    for name in ('revenue', 'units', 'orders'):
+                        total[name] += row[name]
+
+        DailySales.objects.filter(date__range=(start, end)).delete()
+        DailyProductSales.objects.filter(date__range=(start, end)).delete()
+        DailySales.objects.bulk_create([
+            DailySales(date=day, revenue=row['revenue'], units=row['units'], order_count=row['orders'])
+            for (day,), row in daily.items()
+        ])
+        DailyProductSales.objects.bulk_create([
+            DailyProductSales(
+                date=day, product_id=product_id,
+                revenue=row['revenue'], units=row['units'], order_count=row['orders'],
+            )
+            for (day, product_id), row in per_product.items()
+        ], batch_size=1000)
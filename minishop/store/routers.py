@@ -0,0 +1,96 @@
+import random
+
+from asgiref.local import Local
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Read-mostly catalogue and order-history tables that can tolerate replica lag.
+# Everything else (sessions, auth, wishlist) keeps reading from the primary.
+REPLICA_READ_MODELS = {
+    'store.product',
+    'store.order',
+    'store.orderitem',
+    'store.archivedorder',
+    'store.archivedorderitem',
+    'store.dailysales',
+    'store.dailyproductsales',
+    'store.catalogueversion',
+}
+
+_state = Local()
+
+
+def reset_pin(pinned=False):
+    """Start a new request: pinned or not, and with no writes seen yet."""
+    _state.pinned = pinned
+    _state.wrote = False
+    _state.replica = None
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False)
+
+
+def has_written():
+    """True once this request (or thread) wrote to a replicated table."""
+    return getattr(_state, 'wrote', False)
+
+
+def replica_aliases():
+    return [alias for alias in getattr(settings, 'REPLICA_DATABASES', []) if alias in settings.DATABASES]
+
+
+def current_replica():
+    """The replica this request reads from, picked at random on its first replica read.
+
+    Staying on one replica keeps a request's reads consistent with each other,
+    since replicas can lag by different amounts. Outside requests (commands,
+    background threads) the choice lasts until the next reset_pin().
+    """
+    replicas = replica_aliases()
+    if not replicas:
+        return DEFAULT_DB_ALIAS
+    replica = getattr(_state, 'replica', None)
+    if replica not in replicas:
+        replica = _state.replica = random.choice(replicas)
+    return replica
+
+
+class PrimaryReplicaRouter:
+    """Send catalogue / history reads to one replica per request and everything else to the primary.
+
+    Reads stay on the primary when replicas are disabled (USE_READ_REPLICAS),
+    inside a transaction on the primary, and once the current request or the
+    client (see PrimaryPinMiddleware) has written to one of those tables.
+
+    Replicas get their schema from the primary, so nothing is migrated on
+    them. To try it locally, point `default` and `replica1` at the same
+    SQLite file (or give the replica TEST = {'MIRROR': 'default'} in test
+    runs) and set REPLICA_DATABASES = ['replica1'].
+    """
+
+    def db_for_read(self, model, **hints):
+        if not getattr(settings, 'USE_READ_REPLICAS', True) or is_pinned():
+            return DEFAULT_DB_ALIAS
+        if model._meta.label_lower not in REPLICA_READ_MODELS:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return current_replica()
+
+    def db_for_write(self, model, **hints):
+        if model._meta.label_lower in REPLICA_READ_MODELS:
+            # Read-your-writes for the rest of this request.
+            _state.pinned = _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
@@ -0,0 +1,170 @@
+"""Search front-end: cached, coalesced and rate-limited product lookups.
+
+Results, token buckets and the counters behind /admin/analytics/search/
+live in the `default` cache. With the LocMemCache configured in settings
+that cache is per process: each worker keeps its own results, applies its
+own rate limit (so a client gets up to one bucket per worker) and reports
+only its own counters. Point CACHES['default'] at a shared backend (Redis,
+Memcached) to make all three cover the whole deployment. Coalescing is per
+process either way.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .catalogue import get_search_version
+from .models import Product
+
+RESULT_TTL = getattr(settings, 'SEARCH_CACHE_TTL', 30)
+MAX_RESULTS = getattr(settings, 'SEARCH_MAX_RESULTS', 200)
+# (bucket size, tokens refilled per second)
+RATE_LIMIT = getattr(settings, 'SEARCH_RATE_LIMIT', (20, 2.0))
+# Reverse proxies in front of the app that append to X-Forwarded-For
+TRUSTED_PROXY_COUNT = getattr(settings, 'TRUSTED_PROXY_COUNT', 0)
+
+METRIC_KEYS = {
+    'hits': 'search:metrics:hits',
+    'misses': 'search:metrics:misses',
+    'coalesced': 'search:metrics:coalesced',
+    'throttled': 'search:metrics:throttled',
+}
+
+
+def normalise_query(query):
+    """Lower-case, collapse whitespace and cap the length so equivalent queries share a cache entry."""
+    return ' '.join(query.lower().split())[:100]
+
+
+def _incr(metric):
+    key = METRIC_KEYS[metric]
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def search_stats():
+    values = cache.get_many(METRIC_KEYS.values())
+    stats = {name: values.get(key, 0) for name, key in METRIC_KEYS.items()}
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+    return stats
+
+
+class _SingleFlight:
+    """Let only one thread per process run a given query; concurrent callers wait for its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {'done': threading.Event(), 'result': None, 'error': None}
+
+        if not leader:
+            _incr('coalesced')
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+
+        try:
+            call['result'] = fn()
+            return call['result']
+        except Exception as exc:
+            call['error'] = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call['done'].set()
+
+
+_flight = _SingleFlight()
+
+
+def result_cache_key(query):
+    digest = hashlib.md5(query.encode()).hexdigest()
+    return f'search:results:{get_search_version()}:{digest}'
+
+
+def search_product_ids(query):
+    """Return (ids, truncated) for active products matching the normalised `query`, newest first.
+
+    At most MAX_RESULTS ids; `truncated` is True when more products matched,
+    so the page can say only the newest are shown. Cached for RESULT_TTL
+    seconds under a key that includes the catalogue's search version, so
+    renaming, editing or (de)activating a product invalidates cached results
+    immediately. Stock changes, checkouts and wishlist updates don't affect them.
+    """
+    key = result_cache_key(query)
+    result = cache.get(key)
+    if result is not None:
+        _incr('hits')
+        return result
+
+    def run():
+        # Re-check: the previous leader may have just filled the cache.
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        _incr('misses')
+        found = list(
+            Product.objects.filter(status='ACTIVE')
+            .filter(Q(name__icontains=query) | Q(description__icontains=query))
+            .order_by('-id')
+            .values_list('id', flat=True)[:MAX_RESULTS + 1]
+        )
+        result = (found[:MAX_RESULTS], len(found) > MAX_RESULTS)
+        cache.set(key, result, RESULT_TTL)
+        return result
+
+    return _flight.do(key, run)
+
+
+def client_ip(request):
+    """The client's address: REMOTE_ADDR, or the one the outermost trusted proxy appended.
+
+    Entries to the left of that one come from the client and can be forged.
+    """
+    if TRUSTED_PROXY_COUNT:
+        forwarded = [part.strip() for part in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if part.strip()]
+        if len(forwarded) >= TRUSTED_PROXY_COUNT:
+            return forwarded[-TRUSTED_PROXY_COUNT]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def client_key(request):
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f'ip:{client_ip(request)}'
+
+
+def allow_search(request):
+    """Token-bucket rate limit per client, stored in the Django cache.
+
+    Returns (allowed, retry_after_seconds). The read-modify-write is not
+    atomic across workers, which only lets a burst overshoot slightly. With
+    a per-process cache each worker keeps its own bucket (see module docstring).
+    """
+    capacity, refill_rate = RATE_LIMIT
+    key = f'search:bucket:{client_key(request)}'
+    now = time.time()
+    tokens, stamp = cache.get(key, (capacity, now))
+    tokens = min(capacity, tokens + (now - stamp) * refill_rate)
+    allowed = tokens >= 1
+    if allowed:
+        tokens -= 1
+    else:
+        _incr('throttled')
+    cache.set(key, (tokens, now), int(capacity / refill_rate) + 1)
+    return allowed, 0 if allowed else max(1, int((1 - tokens) / refill_rate + 0.999))
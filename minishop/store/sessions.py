@@ -0,0 +1,62 @@
+"""Batched removal of expired database sessions, counting the carts left in them.
+
+Django's `clearsessions` deletes every expired row in one statement, which
+holds locks for as long as that takes on a large table. Here each batch picks
+at most `batch_size` expired rows through the expire_date index and deletes
+them by primary key in its own short transaction, so a run can be stopped at
+any point and started again.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.db import transaction
+
+
+def empty_stats():
+    return {'sessions': 0, 'carts': 0, 'items': 0, 'value': Decimal('0')}
+
+
+def cart_totals(cart):
+    """(items, value) of a session cart dict; malformed lines count as zero."""
+    items, value = 0, Decimal('0')
+    for line in cart.values():
+        try:
+            quantity = int(line.get('quantity', 0))
+            value += Decimal(line.get('price', 0)) * quantity
+        except (AttributeError, InvalidOperation, TypeError, ValueError):
+            continue
+        items += quantity
+    return items, value
+
+
+def delete_expired_batch(cutoff, batch_size=1000, key_prefix=''):
+    """Delete up to `batch_size` sessions that expired before `cutoff`.
+
+    `key_prefix` limits the batch to session keys starting with it (used by
+    bench_sessions to leave real sessions alone). Returns the empty_stats()
+    counters for the deleted rows: sessions deleted, and how many of them
+    held a non-empty cart, with its items and value. `sessions == 0` means
+    there is nothing left to do.
+    """
+    store = SessionStore()
+    stats = empty_stats()
+    expired = Session.objects.filter(expire_date__lt=cutoff)
+    if key_prefix:
+        expired = expired.filter(session_key__startswith=key_prefix)
+    with transaction.atomic():
+        rows = list(expired.order_by('expire_date').values_list('session_key', 'session_data')[:batch_size])
+        if not rows:
+            return stats
+        for _, data in rows:
+            cart = store.decode(data).get(settings.CART_SESSION_ID)
+            if cart:
+                items, value = cart_totals(cart)
+                stats['carts'] += 1
+                stats['items'] += items
+                stats['value'] += value
+        stats['sessions'] = Session.objects.filter(
+            session_key__in=[key for key, _ in rows], expire_date__lt=cutoff
+        ).delete()[0]
+    return stats
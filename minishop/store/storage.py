@@ -0,0 +1,54 @@
+import re
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+_CSS_SPACE = re.compile(r'\s+')
+_CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+
+
+def minify_css(source):
+    """Drop comments and collapse whitespace. Spaces around ':' are kept (`a :hover` != `a:hover`)."""
+    css = _CSS_COMMENT.sub('', source)
+    css = _CSS_SPACE.sub(' ', css)
+    css = _CSS_PUNCTUATION.sub(r'\1', css)
+    return css.replace(';}', '}').strip() + '\n'
+
+
+def minify_js(source):
+    """Line-based and deliberately conservative: strip indentation, blank lines and whole-line // comments."""
+    lines = (line.strip() for line in source.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//')) + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+class BundledStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """WhiteNoise's hashed + gzip/brotli storage that first writes the STATIC_BUNDLES.
+
+    Each bundle is the minified concatenation of its sources. It is added to
+    collectstatic's post-processing so it gets a content hash (and therefore
+    `Cache-Control: immutable` from WhiteNoise) and pre-compressed variants
+    like every other file.
+
+    collectstatic runs locally (staticfiles/ is committed) with
+    requirements-build.txt installed: without Brotli, WhiteNoise silently
+    skips the .br files.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            for name, sources in getattr(settings, 'STATIC_BUNDLES', {}).items():
+                minify = MINIFIERS[name[name.rfind('.'):]]
+                parts = []
+                for source in sources:
+                    with self.open(source) as handle:
+                        parts.append(handle.read().decode())
+                if self.exists(name):
+                    self.delete(name)
+                self._save(name, ContentFile(minify('\n'.join(parts)).encode()))
+                paths[name] = (self, name)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
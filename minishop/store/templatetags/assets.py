@@ -0,0 +1,24 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+register = template.Library()
+
+
+def _urls(bundle):
+    # In DEBUG the bundles don't exist yet (they are built by collectstatic),
+    # so link the individual source files instead.
+    if settings.DEBUG:
+        return [static(source) for source in settings.STATIC_BUNDLES[bundle]]
+    return [static(bundle)]
+
+
+@register.simple_tag
+def stylesheet(bundle):
+    return format_html_join('\n', '<link rel="stylesheet" href="{}">', ((url,) for url in _urls(bundle)))
+
+
+@register.simple_tag
+def script(bundle):
+    return format_html_join('\n', '<script src="{}"></script>', ((url,) for url in _urls(bundle)))
@@ -0,0 +1,314 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, ignore_warnings, override_settings
+from django.utils import timezone
+
+from . import search
+from .catalogue import bump_catalogue_version
+from .management.commands.startup_profile import measure_startup
+from .middleware import PrimaryPinMiddleware
+from .models import IdempotencyKey, Order, Product, Wishlist
+from .routers import PrimaryReplicaRouter
+
+
+class ListingColumnsTests(TestCase):
+    """Listing pages must not load Product.description (up to 500 chars per card)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(3):
+            Product.objects.create(name=f'Linen shirt {i}', description='Long description. ' * 25,
+                                   price=Decimal('19.99'), stock=5)
+        cls.staff = User.objects.create_user('staff', password='pw', is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_description_not_selected(self, path):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        product_selects = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "store_product"' in query['sql']
+        ]
+        self.assertTrue(product_selects, f'{path} ran no product query')
+        for sql in product_selects:
+            # Only the select list: search filters on description in its WHERE clause.
+            columns = sql.split(' FROM ', 1)[0]
+            self.assertNotIn('"store_product"."description"', columns, sql)
+
+    def test_home(self):
+        self.assert_description_not_selected('/')
+
+    def test_home_sorted(self):
+        self.assert_description_not_selected('/?sort=best_selling')
+
+    def test_search(self):
+        self.assert_description_not_selected('/search/?q=linen')
+
+    def test_admin_product_list(self):
+        self.client.force_login(self.staff)
+        self.assert_description_not_selected('/admin/products/')
+
+
+class AddToCartMessagesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(name='Mug', price=Decimal('5'), stock=3)
+
+    def test_ajax_add_leaves_listing_cacheable(self):
+        self.client.get('/')  # sets the CSRF cookie, part of the listing ETag
+        response = self.client.post(f'/cart/add/{self.product.id}/', {'quantity': 1},
+                                    HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertTrue(response.json()['success'])
+
+        response = self.client.get('/')
+        self.assertEqual(len(response.context['messages']), 0)
+        self.assertTrue(response.has_header('ETag'))
+        response = self.client.get('/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_form_add_queues_message(self):
+        response = self.client.post(f'/cart/add/{self.product.id}/', {'quantity': 1}, follow=True)
+        self.assertEqual([str(m) for m in response.context['messages']], ['Added 1 x Mug to cart'])
+
+
+class IdempotencyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(name='Mug', price=Decimal('5'), stock=3)
+
+    def add(self, key):
+        return self.client.post(f'/cart/add/{self.product.id}/', {'quantity': 1}, HTTP_IDEMPOTENCY_KEY=key,
+                                HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+    def test_retry_replays_the_first_response(self):
+        first, second = self.add('k1'), self.add('k1')
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(self.client.session[settings.CART_SESSION_ID][str(self.product.id)]['quantity'], 1)
+
+    def test_claims_again_when_the_owner_row_vanishes(self):
+        # The insert collides with a row whose owner then fails and deletes it.
+        create = IdempotencyKey.objects.create
+        calls = []
+
+        def collide_once(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                raise IntegrityError('duplicate key')
+            return create(**kwargs)
+
+        with mock.patch.object(IdempotencyKey.objects, 'create', side_effect=collide_once):
+            self.add('k2')
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(IdempotencyKey.objects.get(key='k2').status_code, 200)
+
+
+class ReplicaRoutingTests(SimpleTestCase):
+    replicas = ['replica1', 'replica2']
+
+    def setUp(self):
+        databases = {**settings.DATABASES, **{
+            alias: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': f'{alias}.sqlite3', 'TEST': {'MIRROR': 'default'}}
+            for alias in self.replicas
+        }}
+        override = override_settings(DATABASES=databases, REPLICA_DATABASES=self.replicas, USE_READ_REPLICAS=True)
+        # The router only reads the aliases; no connection to them is opened.
+        with ignore_warnings(message='Overriding setting DATABASES'):
+            override.enable()
+        self.addCleanup(override.disable)
+        self.router = PrimaryReplicaRouter()
+
+    def request_reads(self, request, model=Product, reads=20):
+        """Run `request` through PrimaryPinMiddleware and return the aliases its reads of `model` used."""
+        used = set()
+
+        def view(request):
+            used.update(self.router.db_for_read(model) for _ in range(reads))
+            return HttpResponse()
+
+        PrimaryPinMiddleware(view)(request)
+        return used
+
+    def test_one_replica_per_request(self):
+        seen = set()
+        for _ in range(40):
+            used = self.request_reads(RequestFactory().get('/'))
+            self.assertEqual(len(used), 1)
+            seen |= used
+        # Different requests still spread over both replicas.
+        self.assertEqual(seen, set(self.replicas))
+
+    def test_unsafe_requests_read_primary(self):
+        self.assertEqual(self.request_reads(RequestFactory().post('/cart/add/1/')), {DEFAULT_DB_ALIAS})
+
+    def test_other_models_read_primary(self):
+        self.assertEqual(self.request_reads(RequestFactory().get('/'), model=Wishlist), {DEFAULT_DB_ALIAS})
+
+    def test_no_migrations_on_replicas(self):
+        for alias in self.replicas:
+            self.assertIs(self.router.allow_migrate(alias, 'store', 'product'), False)
+        self.assertIsNone(self.router.allow_migrate(DEFAULT_DB_ALIAS, 'store', 'product'))
+
+
+class StartupBudgetTests(SimpleTestCase):
+    def test_wsgi_import_within_budget(self):
+        startup_ms, modules = measure_startup()
+        slowest = ', '.join(f'{name} {cumulative / 1000:.0f}ms'
+                            for name, _, cumulative in sorted(modules, key=lambda m: -m[2])[:5])
+        self.assertLess(startup_ms, settings.STARTUP_BUDGET_MS, f'slowest imports: {slowest}')
+
+
+class SearchLoadTests(TransactionTestCase):
+    """Many clients searching at once: each distinct query should reach the database once."""
+
+    def setUp(self):
+        cache.clear()
+        for name in ['Linen shirt', 'Linen trousers', 'Wool scarf', 'Cotton socks']:
+            Product.objects.create(name=name, description=f'{name} in three colours.', price=Decimal('10'), stock=5)
+
+    def search(self, query):
+        try:
+            return search.search_product_ids(query)
+        finally:
+            connections.close_all()  # this thread's connections
+
+    def test_repeated_queries_hit_the_cache(self):
+        queries = ['linen', 'wool', 'cotton', 'shirt'] * 100
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(self.search, queries))
+
+        stats = search.search_stats()
+        self.assertEqual(stats['misses'], 4)
+        self.assertEqual(stats['hits'] + stats['coalesced'], len(queries) - 4)
+        self.assertEqual(results[:4], [results[i] for i in range(4, 8)])
+        self.assertEqual(len(results[0][0]), 2)
+
+    def test_concurrent_misses_coalesce(self):
+        calls, release = [], threading.Event()
+
+        def slow_query():
+            calls.append(1)
+            release.wait(5)
+            return [1]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(search._flight.do, 'key', slow_query) for _ in range(8)]
+            for _ in range(500):
+                if search.search_stats()['coalesced'] == 7:
+                    break
+                threading.Event().wait(0.01)
+            release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[1]] * 8)
+
+    def test_only_searchable_changes_invalidate_results(self):
+        key = search.result_cache_key('linen')
+        bump_catalogue_version()  # checkout, wishlist, stock
+        self.assertEqual(search.result_cache_key('linen'), key)
+        product = Product.objects.get(name='Wool scarf')
+        product.name = 'Linen scarf'
+        product.save()
+        self.assertNotEqual(search.result_cache_key('linen'), key)
+        self.assertEqual(len(search.search_product_ids('linen')[0]), 3)
+
+    def test_broad_queries_keep_the_newest_and_say_so(self):
+        with mock.patch.object(search, 'MAX_RESULTS', 2):
+            ids, truncated = search.search_product_ids('s')
+        newest = list(Product.objects.order_by('-id').values_list('id', flat=True)[:2])
+        self.assertEqual((ids, truncated), (newest, True))
+
+
+class SearchRateLimitTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def anonymous(self, **meta):
+        request = RequestFactory().get('/search/', {'q': 'linen'}, **meta)
+        request.user = AnonymousUser()
+        return request
+
+    def test_bucket_empties_after_burst(self):
+        capacity = search.RATE_LIMIT[0]
+        results = [search.allow_search(self.anonymous())[0] for _ in range(capacity + 1)]
+        self.assertEqual(results, [True] * capacity + [False])
+
+    def test_forwarded_for_ignored_without_trusted_proxy(self):
+        request = self.anonymous(REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.2.3.4')
+        self.assertEqual(search.client_key(request), 'ip:10.0.0.1')
+
+    def test_forged_forwarded_for_entries_ignored(self):
+        request = self.anonymous(REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.2.3.4, 203.0.113.7')
+        with mock.patch.object(search, 'TRUSTED_PROXY_COUNT', 1):
+            self.assertEqual(search.client_key(request), 'ip:203.0.113.7')
+
+
+class MoveWishlistToCartTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('shopper', password='pw')
+        cls.products = {
+            name: Product.objects.create(name=name, price=Decimal('5'), stock=stock, status=status)
+            for name, stock, status in [('Mug', 3, 'ACTIVE'), ('Lamp', 0, 'ACTIVE'),
+                                        ('Vase', 1, 'ACTIVE'), ('Rug', 4, 'INACTIVE')]
+        }
+        for product in cls.products.values():
+            Wishlist.objects.create(user=cls.user, product=product)
+
+    def test_skipped_items_report_the_reason(self):
+        self.client.force_login(self.user)
+        session = self.client.session
+        session[settings.CART_SESSION_ID] = {str(self.products['Vase'].id): {'quantity': 1, 'price': '5'}}
+        session.save()
+
+        response = self.client.post('/wishlist/move-to-cart/', {'all': '1'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+        data = response.json()
+        self.assertEqual(data['added'], 1)
+        self.assertCountEqual(data['skipped'], [
+            {'name': 'Lamp', 'reason': 'out of stock'},
+            {'name': 'Vase', 'reason': 'all stock already in your cart'},
+            {'name': 'Rug', 'reason': 'no longer available'},
+        ])
+
+
+class RebuildSalesRollupsTests(TestCase):
+    def setUp(self):
+        Order.objects.create(customer_name='A', customer_email='a@example.com', customer_phone='1',
+                             shipping_address='1 Street', total_amount=Decimal('5'))
+
+    def test_stops_before_today_by_default(self):
+        out = StringIO()
+        call_command('rebuild_sales_rollups', stdout=out)
+        self.assertIn('nothing to rebuild', out.getvalue())
+
+    def test_refuses_explicit_range_covering_today(self):
+        with self.assertRaisesMessage(CommandError, '--include-today'):
+            call_command('rebuild_sales_rollups', end=timezone.localdate(), stdout=StringIO())
+
+
+class BenchSessionsTests(TestCase):
+    def test_leaves_real_sessions_alone(self):
+        expired = SessionStore()
+        expired.set_expiry(-60)
+        expired.create()
+        call_command('bench_sessions', expired=50, live=10, reads=5, batch_size=20, stdout=StringIO())
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), [expired.session_key])
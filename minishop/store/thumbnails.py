@@ -0,0 +1,57 @@
+import os
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .models import USE_CLOUDINARY
+
+THUMBNAIL_SIZE = 120
+THUMBNAIL_TTL = 60 * 60 * 24
+
+
+def _build_local_thumbnail(image):
+    """Write a small JPEG next to the upload (once) and return its storage name."""
+    from PIL import Image
+
+    root, _ = os.path.splitext(image.name)
+    name = f'{os.path.dirname(root)}/thumbs/{os.path.basename(root)}_{THUMBNAIL_SIZE}.jpg'
+    if not default_storage.exists(name):
+        with image.open('rb') as handle:
+            picture = Image.open(handle)
+            picture.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            buffer = BytesIO()
+            picture.convert('RGB').save(buffer, 'JPEG', quality=80)
+        default_storage.save(name, ContentFile(buffer.getvalue()))
+    return name
+
+
+def thumbnail_url(product):
+    """URL of a small derivative of the product image, memoised per product version.
+
+    Cloudinary builds the derivative on its CDN from a transformation URL;
+    local uploads get a JPEG generated on first use. Either way the URL is
+    cached, keyed on updated_at, so changelist rows don't touch storage.
+    """
+    key = f'thumb:{product.pk}:{product.updated_at.timestamp() if product.updated_at else 0}'
+    url = cache.get(key)
+    if url is not None:
+        return url
+
+    url = product.image_url or ''
+    if product.image:
+        try:
+            if USE_CLOUDINARY:
+                url = product.image.build_url(width=THUMBNAIL_SIZE, height=THUMBNAIL_SIZE, crop='fill',
+                                              quality='auto', fetch_format='auto')
+            else:
+                url = default_storage.url(_build_local_thumbnail(product.image))
+        except Exception:
+            # Missing file or unreadable image: show the original rather than nothing.
+            try:
+                url = product.image.url
+            except ValueError:
+                pass
+    cache.set(key, url, THUMBNAIL_TTL)
+    return url
@@ -6,6 +6,7 @@ urlpatterns = [
     path('wishlist/', views.wishlist_view, name='wishlist'),
     path('wishlist/add/<int:product_id>/', views.add_to_wishlist, name='add_to_wishlist'),
     path('wishlist/remove/<int:product_id>/', views.remove_from_wishlist, name='remove_from_wishlist'),
+    path('wishlist/move-to-cart/', views.move_wishlist_to_cart, name='move_wishlist_to_cart'),
     path('', views.HomeView.as_view(), name='home'),
     path('products/', views.HomeView.as_view(), name='products'),
     path('search/', views.search_view, name='search'),
@@ -26,4 +27,6 @@ urlpatterns = [
     path('admin/products/new/', views.AdminProductCreateView.as_view(), name='admin_product_create'),
     path('admin/products/<int:pk>/edit/', views.AdminProductUpdateView.as_view(), name='admin_product_update'),
     path('admin/products/<int:pk>/delete/', views.AdminProductDeleteView.as_view(), name='admin_product_delete'),
+    path('admin/analytics/sales/', views.sales_analytics_view, name='admin_sales_analytics'),
+    path('admin/analytics/search/', views.search_metrics_view, name='admin_search_metrics'),
 ]
\ No newline at end of file
@@ -1,5 +1,6 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse
+from django.core.paginator import Paginator
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
@@ -10,24 +11,54 @@ from django.db import transaction
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.admin.views.decorators import staff_member_required
 from django.utils.decorators import method_decorator
-from .models import Product, Order, OrderItem
-from django.db.models import Q
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from .models import Product, Order, OrderItem, DailySales, DailyProductSales
+from django.db.models import F, Sum
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login as auth_login
 from .forms import CheckoutForm, ProductForm
 from .cart import Cart
+from .rollups import record_order
+from .recommendations import record_order_pairs, related_products
+from .catalogue import bump_catalogue_version, listing_etag, product_etag, product_last_modified
+from .archive import find_order, orders_for_email
+from .idempotency import idempotent
+from .search import allow_search, normalise_query, search_product_ids, search_stats
+import datetime
+from decimal import Decimal
 
 # Public Views
+# Catalogue pages answer conditional GETs with 304s; `no-cache` makes browsers
+# revalidate every time instead of guessing freshness from Last-Modified.
+@method_decorator([cache_control(private=True, no_cache=True), condition(etag_func=listing_etag)], name='dispatch')
 class HomeView(ListView):
     model = Product
     template_name = 'home.html'
     context_object_name = 'products'
+
+    # `?sort=` options. Popularity sorts read the denormalised, indexed counters
+    # on Product instead of aggregating OrderItem / Wishlist per request.
+    SORT_OPTIONS = {
+        'newest': ('-created_at', '-id'),
+        'price_asc': ('price', 'id'),
+        'price_desc': ('-price', '-id'),
+        'best_selling': ('-units_sold', '-id'),
+        'most_wishlisted': ('-wishlist_count', '-id'),
+    }
     
     def get_queryset(self):
-        return Product.objects.filter(status='ACTIVE', stock__gt=0)
+        queryset = Product.objects.filter(status='ACTIVE', stock__gt=0).for_listing()
+        ordering = self.SORT_OPTIONS.get(self.request.GET.get('sort'))
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        sort = self.request.GET.get('sort')
+        context['sort'] = sort if sort in self.SORT_OPTIONS else ''
         
         if self.request.user.is_staff:
             # Calculate stats for admin users
@@ -59,22 +90,36 @@ class HomeView(ListView):
 
         return context
 
+@method_decorator([
+    cache_control(private=True, no_cache=True),
+    condition(etag_func=product_etag, last_modified_func=product_last_modified),
+], name='dispatch')
 class ProductDetailView(DetailView):
     model = Product
     template_name = 'product_detail.html'
     context_object_name = 'product'
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['related_products'] = related_products(self.object)
+        return context
+
 
 def search_view(request):
     query = request.GET.get('q', '').strip()
     if query:
-        products = Product.objects.filter(status='ACTIVE').filter(
-            Q(name__icontains=query) | Q(description__icontains=query)
-        )
+        allowed, retry_after = allow_search(request)
+        if not allowed:
+            response = HttpResponse('Too many searches, please slow down.', status=429)
+            response['Retry-After'] = str(retry_after)
+            return response
+        ids, truncated = search_product_ids(normalise_query(query))
+        products = Product.objects.filter(id__in=ids).order_by('-id').for_listing()
     else:
-        products = Product.objects.filter(status='ACTIVE', stock__gt=0)
+        truncated = False
+        products = Product.objects.filter(status='ACTIVE', stock__gt=0).for_listing()
 
-    return render(request, 'home.html', {'products': products, 'query': query})
+    return render(request, 'home.html', {'products': products, 'query': query, 'truncated': truncated})
 
 
 def register_view(request):
@@ -104,8 +149,10 @@ def profile_view(request):
 
 def cart_view(request):
     cart = Cart(request)
+    cart.reconcile()  # reprice before rendering so the page shows current prices and flags
     return render(request, 'cart.html', {'cart': cart})
 
+@idempotent
 def add_to_cart(request, product_id):
     product = get_object_or_404(Product, id=product_id, status='ACTIVE')
     cart = Cart(request)
@@ -153,9 +200,9 @@ def add_to_cart(request, product_id):
 
         # Safe to add
         cart.add(product, quantity)
-        messages.success(request, f'Added {quantity} x {product.name} to cart')
 
-        # If AJAX request, return JSON so frontend can update without reload
+        # If AJAX request, return JSON so frontend can update without reload.
+        # The page shows its own toast, so nothing is queued for the next one.
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({
                 'success': True,
@@ -163,6 +210,8 @@ def add_to_cart(request, product_id):
                 'cart_total': str(cart.get_total())
             })
 
+        messages.success(request, f'Added {quantity} x {product.name} to cart')
+
         # Respect `next` parameter from the form (so listing pages can stay on page)
         next_url = request.POST.get('next') or request.META.get('HTTP_REFERER')
         if next_url:
@@ -249,6 +298,7 @@ def clear_cart(request):
         messages.success(request, 'Cart cleared')
     return redirect('cart')
 
+@idempotent
 def checkout_view(request):
     cart = Cart(request)
     
@@ -261,6 +311,18 @@ def checkout_view(request):
         if form.is_valid():
             try:
                 with transaction.atomic():
+                    # Reprice inside the transaction so prices and stock are read
+                    # from the primary. The order total and every line come from
+                    # these same reconciled lines; nothing is fetched per line.
+                    lines = cart.reconcile()
+                    if cart.removed or any(line['price_changed'] for line in lines):
+                        # Don't charge a total the customer hasn't seen: show
+                        # the repriced, flagged lines and let them confirm again.
+                        return render(request, 'checkout.html', {'form': form, 'cart': cart, 'cart_changed': True})
+                    for line in lines:
+                        if line['insufficient_stock']:
+                            raise ValueError(f"Insufficient stock for {line['product'].name}")
+
                     # Create order
                     order = Order.objects.create(
                         customer_name=form.cleaned_data['name'],
@@ -270,28 +332,38 @@ def checkout_view(request):
                         total_amount=cart.get_total()
                     )
                     
-                    # Create order items and update stock
-                    for item in cart:
-                        product = item['product']
-                        quantity = item['quantity']
-                        
-                        # Check stock
-                        if product.stock < quantity:
-                            raise ValueError(f'Insufficient stock for {product.name}')
-                        
-                        # Create order item
-                        OrderItem.objects.create(
+                    # Create order items
+                    OrderItem.objects.bulk_create([
+                        OrderItem(
                             order=order,
-                            product=product,
-                            quantity=quantity,
-                            unit_price=product.price,
-                            subtotal=quantity * product.price
+                            product=line['product'],
+                            quantity=line['quantity'],
+                            unit_price=line['price'],
+                            subtotal=line['total_price'],
+                        )
+                        for line in lines
+                    ])
+
+                    # Update stock and the sales counter in one UPDATE per product
+                    # so concurrent checkouts don't overwrite each other. Sorted so
+                    # they take the row locks in the same order.
+                    for line in sorted(lines, key=lambda line: line['product'].pk):
+                        product, quantity = line['product'], line['quantity']
+                        updated = Product.objects.filter(pk=product.pk, stock__gte=quantity).update(
+                            stock=F('stock') - quantity,
+                            units_sold=F('units_sold') + quantity,
+                            updated_at=timezone.now(),
                         )
-                        
-                        # Update stock
-                        product.stock -= quantity
-                        product.save()
+                        if not updated:
+                            raise ValueError(f'Insufficient stock for {product.name}')
                     
+                    # Stock changed, so listing and product ETags must change too
+                    bump_catalogue_version()
+
+                    # Fold the order into the daily sales rollups once it commits
+                    transaction.on_commit(lambda: record_order(order.id), robust=True)
+                    transaction.on_commit(lambda: record_order_pairs(order.id), robust=True)
+
                     # Clear cart
                     cart.clear()
                     
@@ -306,10 +378,13 @@ def checkout_view(request):
     else:
         form = CheckoutForm()
     
+    cart.reconcile()
     return render(request, 'checkout.html', {'form': form, 'cart': cart})
 
 def order_confirmation(request, order_id):
-    order = get_object_or_404(Order, id=order_id)
+    order = find_order(order_id)
+    if order is None:
+        raise Http404('No order matches the given query.')
     return render(request, 'order_confirmation.html', {'order': order})
 
 
@@ -319,13 +394,13 @@ def orders_view(request):
 
     Because `Order` isn't linked to `User` directly in the model,
     we match by the user's email when available. If no email/match,
-    an empty list is returned.
+    an empty list is returned. Archived orders are included.
     """
     user = request.user
     if user.is_authenticated and user.email:
-        orders = Order.objects.filter(customer_email=user.email).order_by('-created_at')
+        orders = orders_for_email(user.email)
     else:
-        orders = Order.objects.none()
+        orders = []
 
     return render(request, 'orders.html', {'orders': orders})
 
@@ -336,6 +411,9 @@ class AdminProductListView(ListView):
     template_name = 'admin/product_list.html'
     context_object_name = 'products'
 
+    def get_queryset(self):
+        return Product.objects.only('id', 'name', 'price', 'stock', 'status')
+
 @method_decorator(staff_member_required, name='dispatch')
 class AdminProductCreateView(CreateView):
     model = Product
@@ -367,17 +445,138 @@ class AdminProductDeleteView(DeleteView):
     def delete(self, request, *args, **kwargs):
         messages.success(request, 'Product deleted successfully')
         return super().delete(request, *args, **kwargs)
+
+@staff_member_required
+def sales_analytics_view(request):
+    """JSON revenue / top-product report for a date range.
+
+    Reads only the daily rollup tables, so the cost grows with the number of
+    days requested rather than with total order volume.
+    Query params: `start`, `end` (YYYY-MM-DD, default last 30 days), `top` (default 10).
+    """
+    today = timezone.localdate()
+    try:
+        end = datetime.date.fromisoformat(request.GET['end']) if request.GET.get('end') else today
+        start = (datetime.date.fromisoformat(request.GET['start']) if request.GET.get('start')
+                 else end - datetime.timedelta(days=29))
+        top = min(max(int(request.GET.get('top', 10)), 1), 100)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid start/end/top parameter'}, status=400)
+    if start > end:
+        return JsonResponse({'error': 'start must not be after end'}, status=400)
+
+    days = DailySales.objects.filter(date__range=(start, end)).values('date', 'revenue', 'units', 'order_count')
+    days = [
+        {'date': row['date'].isoformat(), 'revenue': str(row['revenue']),
+         'units': row['units'], 'order_count': row['order_count']}
+        for row in days
+    ]
+
+    top_products = (
+        DailyProductSales.objects.filter(date__range=(start, end))
+        .values('product_id', 'product__name')
+        .annotate(revenue=Sum('revenue'), units=Sum('units'))
+        .order_by('-revenue')[:top]
+    )
+
+    return JsonResponse({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'totals': {
+            'revenue': str(sum((Decimal(day['revenue']) for day in days), Decimal('0'))),
+            'units': sum(day['units'] for day in days),
+            'order_count': sum(day['order_count'] for day in days),
+        },
+        'days': days,
+        'top_products': [
+            {'id': row['product_id'], 'name': row['product__name'],
+             'revenue': str(row['revenue']), 'units': row['units']}
+            for row in top_products
+        ],
+    })
+
+@staff_member_required
+def search_metrics_view(request):
+    """JSON counters for the search cache (hits, misses, coalesced, throttled, hit_ratio).
+
+    Per process while the default cache is LocMemCache: each worker answers with its own.
+    """
+    return JsonResponse(search_stats())
+
+WISHLIST_PAGE_SIZE = 24
+
 @login_required
 def wishlist_view(request):
-    wishlist_items = Wishlist.objects.filter(user=request.user).select_related('product')
-    wishlist_count = wishlist_items.count()
-    
+    # The paginator's COUNT plus one query for the page, however long the wishlist is.
+    wishlist_items = (
+        Wishlist.objects.filter(user=request.user)
+        .select_related('product')
+        .order_by('-added_date', '-id')
+    )
+    page = Paginator(wishlist_items, WISHLIST_PAGE_SIZE).get_page(request.GET.get('page'))
+    request.wishlist_count = page.paginator.count  # reused by the wishlist_count context processor
+
     return render(request, 'wishlist.html', {
-        'wishlist_items': wishlist_items,
-        'wishlist_count': wishlist_count,
+        'wishlist_items': page,
+        'page_obj': page,
+        'wishlist_count': page.paginator.count,
         'cart_items_count': request.cart_count if hasattr(request, 'cart_count') else 0,
     })
 
+@idempotent
+def move_wishlist_to_cart(request):
+    """Add one of each selected (`product_ids`) or all (`all=1`) wishlist products to the cart.
+
+    Stock is checked for every chosen product in one query and the session
+    cart is written once. Items stay on the wishlist, like the per-item button.
+    """
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    if request.method != 'POST':
+        if is_ajax:
+            return JsonResponse({'success': False, 'error': 'POST required'}, status=400)
+        return redirect('wishlist')
+
+    if not request.user.is_authenticated:
+        if is_ajax:
+            return JsonResponse({'success': False, 'login_required': True, 'login_url': reverse('login')}, status=401)
+        return redirect(f"{reverse('login')}?next={reverse('wishlist')}")
+
+    chosen = Wishlist.objects.filter(user=request.user)
+    if request.POST.get('all') != '1':
+        chosen = chosen.filter(product_id__in=[pk for pk in request.POST.getlist('product_ids') if pk.isdigit()])
+    products = Product.objects.filter(id__in=chosen.values('product_id')).only('id', 'name', 'price', 'stock', 'status')
+
+    cart = Cart(request)
+    added, skipped = [], []
+    for product in products:
+        in_cart = int(cart.cart.get(str(product.id), {}).get('quantity', 0))
+        if product.status != 'ACTIVE':
+            reason = 'no longer available'
+        elif not product.stock:
+            reason = 'out of stock'
+        elif product.stock - in_cart < 1:
+            reason = 'all stock already in your cart'
+        else:
+            added.append(product)
+            continue
+        skipped.append({'name': product.name, 'reason': reason})
+    cart.add_many(added)
+
+    if is_ajax:
+        return JsonResponse({
+            'success': True,
+            'added': len(added),
+            'skipped': skipped,
+            'cart_count': len(cart),
+            'cart_total': str(cart.get_total()),
+        })
+
+    if added:
+        messages.success(request, f'Added {len(added)} item(s) to cart')
+    if skipped:
+        messages.warning(request, 'Could not add: ' + ', '.join(f"{item['name']} ({item['reason']})" for item in skipped))
+    return redirect('wishlist')
+
 def add_to_wishlist(request, product_id):
     product = get_object_or_404(Product, id=product_id)
 
@@ -403,6 +602,9 @@ def add_to_wishlist(request, product_id):
         user=request.user,
         product=product
     )
+    if created:
+        Product.objects.filter(pk=product.pk).update(wishlist_count=F('wishlist_count') + 1)
+        bump_catalogue_version()  # reorders the "most wishlisted" listing
 
     wishlist_count = Wishlist.objects.filter(user=request.user).count()
 
@@ -431,7 +633,12 @@ def remove_from_wishlist(request, product_id):
             return JsonResponse({'success': False, 'login_required': True, 'login_url': reverse('login')}, status=401)
         return redirect(f"{reverse('login')}?next={request.path}")
 
-    Wishlist.objects.filter(user=request.user, product=product).delete()
+    deleted, _ = Wishlist.objects.filter(user=request.user, product=product).delete()
+    if deleted:
+        Product.objects.filter(pk=product.pk, wishlist_count__gt=0).update(
+            wishlist_count=F('wishlist_count') - 1
+        )
+        bump_catalogue_version()
 
     wishlist_count = Wishlist.objects.filter(user=request.user).count()
 
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.template import engines
+from django.template.loader import get_template
+from django.urls import get_resolver
+from django.utils import translation
+
+# Templates compiled into the cached loader before the first request.
+WARM_TEMPLATES = ['base.html', 'home.html', 'product_detail.html', 'cart.html']
+
+
+def warm_up():
+    """Do the lazy per-process setup Django would otherwise do on the first request.
+
+    Imports every view module and builds the reverse-URL map (which also pulls
+    in the admin), creates the template engine and its tag libraries, compiles
+    the hot templates and loads the translation catalog for each language.
+    """
+    get_resolver()._populate()
+    engines['django'].engine
+    for name in WARM_TEMPLATES:
+        get_template(name)
+    for code, _ in settings.LANGUAGES:
+        translation.trans_real.translation(code)